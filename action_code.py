@@ -499,33 +499,26 @@ def get_action_code(x):
         return x if x > 9 else ASCII_TO_KEYCODE[ord(str(x))]
     if type(x) is str and len(x) == 1:
         return ASCII_TO_KEYCODE[ord(x)] & 0x7F
+    if type(x) is str:
+        # key or action name, looked up on demand
+        from keynames import code
+        c = code(x)
+        if c is not None:
+            return c
     if x is None:
         return 0
     raise ValueError('Invalid keyname {}'.format(x))
 
+MODS_MAP = { LCTRL: 1, LSHIFT: 2, LALT: 4, LGUI: 8, RCTRL: 0x11, RSHIFT: 0x12, RALT: 0x14, RGUI: 0x18 }
+
 def MODS(*args):
-    MAP = { LCTRL: 1, LSHIFT: 2, LALT: 4, LGUI: 8, RCTRL: 0x11, RSHIFT: 0x12, RALT: 0x14, RGUI: 0x18 }
     mods = 0
     for m in args:
-        if m not in MAP:
+        if m not in MODS_MAP:
             raise ValueError('Invalid modifier {}'.format(m))
-        mods |= MAP[m]
+        mods |= MODS_MAP[m]
     return mods
 
-def mods_to_keycodes(mods):
-    # if mods & 0x10:
-    #     all_mods = (RCTRL, RSHIFT, RALT, RGUI)
-    # else:
-    #     all_mods = (LCTRL, LSHIFT, LALT, LGUI)
-    # return list(filter(lambda k: mods & (1 << (k & 0x3)), all_mods))
-
-    b = RCTRL if mods & 0x10 else LCTRL
-    o = []
-    for i in range(4):
-        if (mods >> i) & 1:
-            o.append(b + i)
-    return o
-
 ACTION = lambda kind, param: (kind << 12) | param
 
 MODS_KEY = lambda mods, key: ACTION(ACT_MODS, (mods << 8) | get_action_code(key))
@@ -534,7 +527,7 @@ MOUSEKEY = lambda key: ACTION(ACT_MOUSEKEY, key)
 
 LAYER_BITOP = lambda op, part, bits, on: ACTION(ACT_LAYER, op<<10|on<<8|part<<5|(bits&0x1f))
 LAYER_BIT_XOR = lambda part, bits, on: LAYER_BITOP(OP_BIT_XOR, part, bits, on)
-LAYER_INVERT = lambda layer, on: LAYER_BIT_XOR(layer/4,   1<<(layer%4),  on)
+LAYER_INVERT = lambda layer, on: LAYER_BIT_XOR(layer//4,  1<<(layer%4),  on)
 LAYER_TOGGLE = lambda layer: LAYER_INVERT(layer, ON_RELEASE)
 
 LAYER_TAP = lambda layer, key=NO: ACTION(ACT_LAYER_TAP, (layer << 8) | get_action_code(key))
@@ -562,13 +555,6 @@ MS_DR = MOUSEKEY(8 << 8)
 MS_W_UP = MOUSEKEY(9 << 8)
 MS_W_DN = MOUSEKEY(10 << 8)
 
-MS_MOVEMENT = (
-    (0, 0, 0),
-    (0, -2, 0), (0, 2, 0), (-2, 0, 0), (2, 0, 0),
-    (-1, -1, 0), (1, -1, 0), (-1, 1, 0), (1, 1, 0),
-    (0, 0, 1), (0, 0, -1)
-)
-
 MACRO = lambda n: ACTION(ACT_MACRO, n)
 BACKLIGHT = lambda n: ACTION(ACT_BACKLIGHT, n)
 
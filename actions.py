@@ -0,0 +1,426 @@
+'''
+run 16 bit TMK action codes, shared by main.py and main_v1.py
+
+    kind(4) | param(12), kind = action_code >> 12
+    0000 000r | mods | keycode   ACT_MODS, modified key
+    0010 001r | mods | keycode   ACT_MODS_TAP, mods on hold, key on tap
+    0100 | 0p | usage(10)        ACT_USAGE, p: system 0, consumer 1
+    0101 | ...                   ACT_MOUSEKEY
+    1000 | oo on | ppp E bbbb    ACT_LAYER, layer bit operation
+    101x | layer | keycode       ACT_LAYER_TAP, layer on hold, key on tap
+                                 keycode 0xC0 | mods: layer with mods
+                                 keycode 0xF0: toggle layer on tap
+    1100 ...                     ACT_MACRO, ACT_BACKLIGHT, ACT_COMMAND,
+                                 registered by the firmware
+Codes below 0x100 are plain keycodes. keycode.py and action_code.py
+both build this format.
+
+Actions reads events from the matrix, resolves them through the layer
+stack and calls the output:
+    press_keys(keycodes, keycode=0)     keycodes sequence plus one key,
+    release_keys(keycodes, keycode=0)   sent as one report
+    send_consumer(usage)                0 releases
+    begin(), end()                      around the events of one poll(),
+                                        end() sends the report
+'''
+from array import array
+import gc
+
+from tapping import TapHold
+
+# action kinds, as in action_code.py
+ACT_MODS = 0b0000
+ACT_MODS_TAP = 0b0010
+ACT_USAGE = 0b0100
+ACT_LAYER = 0b1000
+ACT_LAYER_TAP = 0b1010
+ACT_LAYER_TAP_EXT = 0b1011
+
+OP_BIT_AND = 0
+OP_BIT_OR = 1
+OP_BIT_XOR = 2
+OP_BIT_SET = 3
+ON_PRESS = 1
+ON_RELEASE = 2
+OP_TAP_TOGGLE = 0xF0
+TRANSPARENT = 0x01
+
+
+def _mod_keycodes(mods):
+    base = 0xE4 if mods & 0x10 else 0xE0  # right or left control
+    return tuple(base + i for i in range(4) if (mods >> i) & 1)
+
+
+# modifier keycodes of all 32 5-bit mods, built once so the keypress
+# path does not allocate
+MOD_KEYCODES = tuple(_mod_keycodes(mods) for mods in range(32))
+NO_KEYS = ()
+
+
+class Actions:
+    '''
+    Decode and run key events from a Matrix
+
+    actionmap is a sequence of layers, each a sequence of action codes
+    indexed by matrix key. Layers stack like TMK layer_state: the
+    highest active layer wins, TRANSPARENT falls through.
+    '''
+
+    def __init__(self, matrix, output, actionmap=None, tap_delay=500,
+                 fast_type_thresh=200, tap_policy=TapHold.PERMISSIVE_HOLD,
+                 timers=None):
+        self.matrix = matrix
+        self.output = output
+        self.get = matrix.get  # event source, may be wrapped
+        self.combos = None  # combos.Combos ahead of tap-hold, handle=self.feed
+        self.verbose = False
+        self.key_name = hex
+        self.keys = [0] * matrix.keys  # action code of each pressed key
+        self.layer_cache = {}
+        self.layer_order = []
+        self.layer_cache_size = 4
+        self.layer_misses = 0
+        self.layer_mask = 1
+        self.last_time = 0
+        self.event_time = 0  # time of the event handle() runs
+        # gc.mem_alloc() delta per key event, see count_allocation()
+        self.count_alloc = False
+        self.strict_alloc = False
+        self.alloc_events = 0
+        self.alloc_bytes = 0
+        self.alloc_max = 0
+        self.tap_hold = TapHold(
+            self.resolve_tap_hold,
+            self.handle,
+            tap_delay=tap_delay,
+            fast_type_thresh=fast_type_thresh,
+            policy=tap_policy,
+        )
+        # timers.Timers, polls again when a combo or tap-hold key times out
+        self.timers = timers
+        if timers is not None:
+            self.timer = timers.add(self.poll)
+
+        # handlers by kind, action_code >> 12
+        self.press_handlers = [self.ignore] * 16
+        self.release_handlers = [self.ignore] * 16
+        register = self.register
+        for kind in (ACT_MODS, ACT_MODS + 1):
+            register(kind, self.press_mods, self.release_mods)
+        for kind in (ACT_MODS_TAP, ACT_MODS_TAP + 1):
+            register(kind, self.press_tap_hold, self.release_mods_tap)
+        register(ACT_USAGE, self.press_usage, self.release_usage)
+        register(ACT_LAYER, self.press_layer, self.release_layer)
+        for kind in (ACT_LAYER_TAP, ACT_LAYER_TAP_EXT):
+            register(kind, self.press_layer_tap, self.release_layer_tap)
+        self.actionmap = ()
+        if actionmap is not None:
+            self.load(actionmap)
+
+    def register(self, kind, on_press, on_release=None):
+        '''
+        Run on_press(key, action_code) and on_release(key, action_code)
+        for actions of kind
+        '''
+        self.press_handlers[kind] = on_press
+        self.release_handlers[kind] = on_release or self.ignore
+
+    def ignore(self, key, action_code):
+        pass
+
+    def load(self, actionmap):
+        '''
+        Switch to another actionmap, back to layer 0
+
+        Buffered combo and tap-hold events run through the current
+        actionmap first, releases among them belong to keys the host
+        has down.
+        '''
+        self.output.begin()
+        if self.combos is not None:
+            self.combos.flush()
+        self.tap_hold.flush()
+        self.output.end()
+        self.actionmap = actionmap
+        self.layer_cache.clear()
+        self.layer_order.clear()
+        self.layer_mask = 1
+
+    def poll(self):
+        '''
+        Run the queued events of the matrix
+
+        Returns:
+            number of events taken from the matrix
+        '''
+        matrix = self.matrix
+        combos = self.combos
+        n = 0
+        self.output.begin()
+        while len(matrix):
+            # the time queued with the event, the key may change again
+            # before this poll
+            t = matrix.view_time(0)
+            event = self.get()
+            if combos is None or not combos.add(event, t):
+                self.feed(event, t)
+            n += 1
+        t = matrix.time()
+        if combos is not None:
+            combos.poll(t)
+        self.tap_hold.poll(t)
+        self.output.end()
+        if self.timers is not None:
+            left = self.timeout()
+            if left < 0:
+                self.timers.cancel(self.timer)
+            else:
+                self.timers.start(self.timer, left, t)
+        return n
+
+    def feed(self, event, t):
+        '''
+        Run event at t, or hold it back while a tap-hold key is pending
+        '''
+        if not self.tap_hold.add(event, t):
+            self.handle(event, t)
+
+    def timeout(self, t=-1):
+        '''
+        Returns:
+            t ms capped to the time left for pending combo and tap-hold
+            keys, -1 for t=-1 and nothing pending
+        '''
+        now = self.matrix.time()
+        if self.combos is not None and self.combos.pending:
+            left = self.combos.timeout(now)
+            if t < 0 or left < t:
+                t = left
+        if self.tap_hold.pending:
+            left = self.tap_hold.timeout(now)
+            if t < 0 or left < t:
+                t = left
+        return t
+
+    def handle(self, event, t=None):
+        '''
+        Run the action of a key event at t, by default the last change of
+        its key
+        '''
+        matrix = self.matrix
+        key = event & 0x7F
+        if t is None:
+            if event & 0x80:
+                t = matrix.get_keyup_time(key)
+            else:
+                t = matrix.get_keydown_time(key)
+        self.event_time = t
+        count_alloc = self.count_alloc or self.strict_alloc
+        if count_alloc:
+            misses = self.layer_misses
+            allocated = gc.mem_alloc()
+        if event & 0x80 == 0:
+            action_code = self.action_code(key)
+            self.keys[key] = action_code
+            if action_code < 0xFF:
+                self.output.press_keys(NO_KEYS, action_code)
+            else:
+                self.press_handlers[action_code >> 12](key, action_code)
+        else:
+            action_code = self.keys[key]
+            if action_code < 0xFF:
+                self.output.release_keys(NO_KEYS, action_code)
+            else:
+                self.release_handlers[action_code >> 12](key, action_code)
+        if count_alloc and misses == self.layer_misses:
+            self.count_allocation(gc.mem_alloc() - allocated, event)
+        if self.verbose:
+            dt = matrix.ms(matrix.time() - t)
+            dt2 = matrix.ms(t - self.last_time)
+            self.last_time = t
+            print(
+                '{} {} {} {} latency {} | {}'.format(
+                    key,
+                    self.key_name(key),
+                    '/' if event & 0x80 else '\\',
+                    hex(action_code),
+                    dt,
+                    dt2,
+                )
+            )
+
+    def count_allocation(self, size, event):
+        '''
+        Account heap allocated while handling event
+
+        The keypress path should allocate nothing once the layer cache is
+        warm, events that resolve a layer_mask are not counted. Set
+        count_alloc to collect the counters, strict_alloc to raise on the
+        first allocating event.
+        '''
+        if size <= 0:
+            return
+        self.alloc_events += 1
+        self.alloc_bytes += size
+        if size > self.alloc_max:
+            self.alloc_max = size
+        if self.strict_alloc:
+            raise MemoryError('event {} allocated {} bytes'.format(hex(event), size))
+
+    @property
+    def layer_mask(self):
+        return self._layer_mask
+
+    @layer_mask.setter
+    def layer_mask(self, mask):
+        # resolved again on the next keypress, usually from the cache
+        self._layer_mask = mask
+        self.actions = None
+
+    def action_code(self, key):
+        actions = self.actions
+        if actions is None:
+            actions = self.actions = self.layer_actions(self._layer_mask)
+        return actions[key]
+
+    def layer_actions(self, layer_mask):
+        '''
+        Action codes of all keys for layer_mask, cached for the last
+        layer_cache_size masks
+        '''
+        cache = self.layer_cache
+        order = self.layer_order
+        actions = cache.get(layer_mask)
+        if actions is None:
+            self.layer_misses += 1
+            if len(order) >= self.layer_cache_size:
+                del cache[order.pop(0)]
+            actions = cache[layer_mask] = self.resolve_layers(layer_mask)
+        else:
+            order.remove(layer_mask)
+        order.append(layer_mask)
+        return actions
+
+    def resolve_layers(self, layer_mask):
+        '''Highest enabled layer wins, TRANSPARENT falls through'''
+        actionmap = self.actionmap
+        actions = array('H', [0] * len(actionmap[0]))
+        for layer in range(len(actionmap)):
+            if (layer_mask >> layer) & 1:
+                codes = actionmap[layer]
+                for i in range(len(codes)):
+                    code = codes[i]
+                    if code != TRANSPARENT:
+                        actions[i] = code
+        return actions
+
+    def layer_bitop(self, action_code):
+        '''
+        ACT_LAYER: 1000|oo00|pppE BBBB, op oo on the 4 layers of part ppp,
+        E keeps the layers outside the part
+        '''
+        shift = ((action_code >> 5) & 0x7) * 4
+        bits = (action_code & 0xF) << shift
+        mask = 0
+        if action_code & 0x10:
+            mask = ~(0xF << shift) & 0xFFFFFFFF
+        op = (action_code >> 10) & 0x3
+        if op == OP_BIT_AND:
+            self.layer_mask &= bits | mask
+        elif op == OP_BIT_OR:
+            self.layer_mask |= bits | mask
+        elif op == OP_BIT_XOR:
+            self.layer_mask ^= bits | mask
+        elif op == OP_BIT_SET:
+            # as TMK: layer_and(mask), layer_or(bits)
+            self.layer_mask = (self.layer_mask & mask) | bits
+        if self.verbose:
+            print('layer_mask = {}'.format(self.layer_mask))
+
+    def press_mods(self, key, action_code):
+        self.output.press_keys(MOD_KEYCODES[(action_code >> 8) & 0x1F], action_code & 0xFF)
+
+    def release_mods(self, key, action_code):
+        self.output.release_keys(MOD_KEYCODES[(action_code >> 8) & 0x1F], action_code & 0xFF)
+
+    def press_tap_hold(self, key, action_code):
+        # decided later by the tap_hold resolver, see resolve_tap_hold()
+        self.tap_hold.start(key, self.event_time)
+
+    def resolve_tap_hold(self, key, hold):
+        action_code = self.keys[key]
+        if action_code >> 12 < ACT_USAGE:
+            self.resolve_mods_tap(key, action_code, hold)
+        else:
+            self.resolve_layer_tap(key, action_code, hold)
+
+    def resolve_mods_tap(self, key, action_code, hold):
+        if hold:
+            self.output.press_keys(MOD_KEYCODES[(action_code >> 8) & 0x1F])
+        else:
+            if self.verbose:
+                print('TAP')
+            keycode = action_code & 0xFF
+            self.keys[key] = keycode
+            self.output.press_keys(NO_KEYS, keycode)
+
+    def release_mods_tap(self, key, action_code):
+        self.output.release_keys(MOD_KEYCODES[(action_code >> 8) & 0x1F])
+
+    def press_usage(self, key, action_code):
+        if action_code & 0x400:
+            self.output.send_consumer(action_code & 0x3FF)
+
+    def release_usage(self, key, action_code):
+        if action_code & 0x400:
+            self.output.send_consumer(0)
+
+    def press_layer(self, key, action_code):
+        if (action_code >> 8) & ON_PRESS:
+            self.layer_bitop(action_code)
+
+    def release_layer(self, key, action_code):
+        if (action_code >> 8) & ON_RELEASE:
+            self.layer_bitop(action_code)
+
+    def press_layer_tap(self, key, action_code):
+        if action_code & 0xE0 == 0xC0:
+            if self.verbose:
+                print('LAYER_MODS')
+            self.output.press_keys(MOD_KEYCODES[action_code & 0x1F])
+            self.layer_mask |= 1 << ((action_code >> 8) & 0x1F)
+            if self.verbose:
+                print('layer_mask = {}'.format(self.layer_mask))
+        else:
+            self.press_tap_hold(key, action_code)
+
+    def resolve_layer_tap(self, key, action_code, hold):
+        layer = (action_code >> 8) & 0x1F
+        mask = 1 << layer
+        if hold:
+            self.layer_mask |= mask
+        else:
+            keycode = action_code & 0xFF
+            if keycode == OP_TAP_TOGGLE:
+                if self.verbose:
+                    print('TAP TOGGLE {}'.format(layer))
+                self.layer_mask = (self.layer_mask & ~mask) | (mask & ~self.layer_mask)
+                self.keys[key] = 0
+            else:
+                if self.verbose:
+                    print('TAP')
+                self.keys[key] = keycode
+                self.output.press_keys(NO_KEYS, keycode)
+        if self.verbose:
+            print('layer_mask = {}'.format(self.layer_mask))
+
+    def release_layer_tap(self, key, action_code):
+        layer = (action_code >> 8) & 0x1F
+        keycode = action_code & 0xFF
+        if keycode & 0xE0 == 0xC0:
+            if self.verbose:
+                print('LAYER_MODS')
+            self.output.release_keys(MOD_KEYCODES[keycode & 0x1F])
+        self.layer_mask &= ~(1 << layer)
+        if self.verbose:
+            print('layer_mask = {}'.format(self.layer_mask))
@@ -0,0 +1,99 @@
+'''
+allocation check of the keypress path
+
+Run on the board or on the MicroPython Unix port:
+    micropython alloc_check.py
+Drives Actions.poll() through a tap, a hold of a dual-role key, a layer
+key and a combo on a Matrix over the FakeI2C expander, with strict_alloc
+on. The first pass warms the layer cache, the second one must not
+allocate: every poll() is measured with gc.mem_alloc() and a key event
+that allocates raises MemoryError from Actions.count_allocation().
+'''
+import gc
+from time import ticks_ms, sleep_ms
+
+from actions import Actions
+from backends import FakeI2C, MCP23017Backend
+from combos import Combos
+from hid import HID, report_devices
+from matrix import Matrix
+
+TAP_DELAY = 50
+A = 0x04
+X = 0x1B
+MT_SHIFT_B = 0x2205  # MODS_TAP(LSHIFT, B)
+LT1_C = 0xA106  # LAYER_TAP(1, C)
+TRANSPARENT = 1
+# keys 0-4 of the 8 x 8 matrix, key 0 is X on layer 1, keys 3 and 4
+# are a combo
+ACTIONMAP = (
+    (A, MT_SHIFT_B, LT1_C, 0x07, 0x08) + (0,) * 59,
+    (X,) + (TRANSPARENT,) * 63,
+)
+UP = 0x80
+# key events, negative numbers wait that many ms
+STEPS = (
+    ('tap', (0, UP | 0)),
+    ('dual-role tap', (1, UP | 1)),
+    ('dual-role hold', (1, -2 * TAP_DELAY, 0, UP | 0, UP | 1)),
+    ('layer hold', (2, -2 * TAP_DELAY, 0, UP | 0, UP | 2)),
+    ('combo', (3, 4, UP | 3, UP | 4)),
+)
+
+
+def run(actions, matrix, strict):
+    '''
+    Returns:
+        largest gc.mem_alloc() growth of one poll() per step name
+    '''
+    actions.strict_alloc = strict
+    worst = []
+    for name, events in STEPS:
+        most = 0
+        for event in events:
+            if event < 0:
+                sleep_ms(-event)
+            else:
+                matrix.put(event, ticks_ms())
+            allocated = gc.mem_alloc()
+            actions.poll()
+            most = max(most, gc.mem_alloc() - allocated)
+        # let a pending dual-role key or combo time out
+        sleep_ms(2 * TAP_DELAY)
+        allocated = gc.mem_alloc()
+        actions.poll()
+        worst.append((name, max(most, gc.mem_alloc() - allocated)))
+    return worst
+
+
+def main():
+    matrix = Matrix(backend=MCP23017Backend(FakeI2C()))
+    hid = HID(report_devices())
+    actions = Actions(matrix, hid, ACTIONMAP, tap_delay=TAP_DELAY,
+                      fast_type_thresh=0)
+    fired = [0]
+
+    def fire(n):
+        fired[0] += 1
+
+    actions.combos = Combos(matrix.keys, actions.feed, fire, TAP_DELAY)
+    actions.combos.combo({3, 4})
+    run(actions, matrix, False)  # warm up
+    gc.collect()
+    gc.disable()
+    try:
+        worst = run(actions, matrix, True)
+    finally:
+        gc.enable()
+    failed = False
+    for name, size in worst:
+        print('{:16} {:4} bytes'.format(name, size))
+        failed = failed or size > 0
+    print('combo fired {} of 2, {} dual-role resolutions of 6'.format(
+        fired[0], actions.tap_hold.resolutions))
+    if failed or fired[0] != 2 or actions.tap_hold.resolutions != 6:
+        raise SystemExit('keypress path allocates')
+    print('ok, no allocation')
+
+
+main()
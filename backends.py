@@ -0,0 +1,241 @@
+'''
+keyboard matrix backends
+
+A backend selects a row and returns all its columns as one packed int,
+bit n set when column n is closed. Matrix only talks to the backend:
+    rows, cols      matrix size
+    read_row(r)     packed column bits of row r
+    sleep(handler)  arm an edge IRQ calling handler(pin), False when the
+                    backend cannot wake the matrix
+    wake()          disarm the IRQ and go back to scanning
+
+FakeSPI and FakeI2C model the shift register chain and the expander so
+the backends can be exercised on a host.
+'''
+from gpio import columns
+
+
+class DirectBackend:
+    '''
+    Rows and columns wired to MCU pins, rows driven high, columns pulled down
+    '''
+
+    def __init__(self, rows, cols):
+        from machine import Pin
+        self.Pin = Pin
+        self.rows = len(rows)
+        self.cols = len(cols)
+        self.row_pins = []  # row as output
+        for row in rows:
+            io = Pin(row, Pin.OUT)
+            io.value(0)
+            self.row_pins.append(io)
+        self.col_pins = []  # col as input
+        for col in cols:
+            io = Pin(col, Pin.IN, Pin.PULL_DOWN)
+            self.col_pins.append(io)
+        self.read = columns(cols, self.col_pins).read
+
+    def read_row(self, r):
+        row = self.row_pins[r]
+        row.value(1)  # select row
+        bits = self.read()
+        row.value(0)
+        return bits
+
+    def sleep(self, handler):
+        '''
+        Drive all rows high and call handler on an edge of any column
+        '''
+        for row in self.row_pins:
+            row.value(1)
+        for col in self.col_pins:
+            col.irq(trigger=self.Pin.IRQ_RISING, handler=handler)
+        for col in self.col_pins:
+            if col.value():
+                # pressed while going idle, the edge is already gone
+                handler(col)
+                break
+        return True
+
+    def wake(self):
+        for col in self.col_pins:
+            col.irq(handler=None)
+        for row in self.row_pins:
+            row.value(0)
+
+
+class ShiftRegisterBackend:
+    '''
+    74HC595 chain drives the rows, 74HC165 chain reads the columns, both
+    on one SPI bus with one latch pin wired to 595 RCLK and 165 SH/LD
+
+    Each SPI transfer shifts in the columns of the selected row while it
+    shifts out the selection of the next row, so a scan in row order
+    costs one write_readinto() per row. Row r is bit r of the 595 chain
+    and column n is bit n of the 165 chain, both read as big-endian
+    ints. Both chains clock on every transfer, so a transfer has the
+    byte count of the longer chain: the row selection is right-aligned
+    and ends up in the 595 chain, the columns come out of the 165 chain
+    first.
+    '''
+
+    def __init__(self, spi, latch, rows, cols):
+        self.spi = spi
+        self.latch = latch
+        self.rows = rows
+        self.cols = cols
+        nbytes = max((rows + 7) // 8, (cols + 7) // 8)
+        self.out = [(1 << r).to_bytes(nbytes, 'big') for r in range(rows)]
+        self.buf = bytearray(nbytes)
+        self.pad = 8 * (nbytes - (cols + 7) // 8)  # bits shifted in after the columns
+        self.mask = (1 << cols) - 1
+        self.selected = None  # row in the 595 shift stage
+        self.latch.value(1)
+
+    def read_row(self, r):
+        if self.selected != r:
+            # out of order, shift in the selection first
+            self.spi.write(self.out[r])
+            self.selected = r
+        latch = self.latch
+        latch.value(0)  # 165 loads, rows still show the previous row
+        latch.value(1)  # 595 outputs row r, 165 shifts
+        latch.value(0)  # 165 loads the columns of row r
+        latch.value(1)
+        r += 1
+        if r == self.rows:
+            r = 0
+        self.spi.write_readinto(self.out[r], self.buf)
+        self.selected = r
+        return (int.from_bytes(self.buf, 'big') >> self.pad) & self.mask
+
+    def sleep(self, handler):
+        return False
+
+    def wake(self):
+        pass
+
+
+# MCP23017 registers, IOCON.BANK = 0
+IODIRA = 0x00
+IODIRB = 0x01
+IPOLB = 0x03
+GPPUB = 0x0D
+GPIOA = 0x12
+GPIOB = 0x13
+
+
+class MCP23017Backend:
+    '''
+    MCP23017 on I2C: port A drives up to 8 rows low, port B reads up to
+    8 columns with pull-ups and inverted polarity, so a closed key reads 1
+
+    Each row costs one write of port A and one read of port B.
+    '''
+
+    def __init__(self, i2c, rows=8, cols=8, addr=0x20):
+        self.i2c = i2c
+        self.addr = addr
+        self.rows = rows
+        self.cols = cols
+        self.out = [bytes((0xFF & ~(1 << r),)) for r in range(rows)]
+        self.buf = bytearray(1)
+        self.mask = (1 << cols) - 1
+        i2c.writeto_mem(addr, GPIOA, b'\xff')
+        i2c.writeto_mem(addr, IODIRA, b'\x00')
+        i2c.writeto_mem(addr, IODIRB, b'\xff')
+        i2c.writeto_mem(addr, GPPUB, b'\xff')
+        i2c.writeto_mem(addr, IPOLB, b'\xff')
+
+    def read_row(self, r):
+        self.i2c.writeto_mem(self.addr, GPIOA, self.out[r])
+        self.i2c.readfrom_mem_into(self.addr, GPIOB, self.buf)
+        return self.buf[0] & self.mask
+
+    def sleep(self, handler):
+        return False
+
+    def wake(self):
+        pass
+
+
+class FakeSPI:
+    '''
+    SPI bus with a 74HC595 row chain and a 74HC165 column chain
+
+    pressed is a set of (row, col) closed keys. Use latch as the latch
+    pin of ShiftRegisterBackend.
+    '''
+
+    def __init__(self, rows, cols):
+        self.pressed = set()
+        self.shift = 0  # 595 shift stage
+        self.outputs = 0  # 595 outputs
+        self.loaded = 0  # 165 parallel load
+        self.nbytes = (cols + 7) // 8  # 165 chain
+        self.rows_mask = (1 << 8 * ((rows + 7) // 8)) - 1  # 595 chain
+        self.latch = _FakeLatch(self)
+        self.transfers = 0
+
+    def write(self, buf):
+        # the 595 chain keeps the last bytes shifted in
+        self.shift = int.from_bytes(buf, 'big') & self.rows_mask
+        self.transfers += 1
+
+    def write_readinto(self, buf, into):
+        # as machine.SPI, and both chains get the same clocks
+        assert len(buf) == len(into), 'write_readinto lengths differ'
+        pad = len(into) - self.nbytes
+        assert pad >= 0, 'transfer shorter than the 165 chain'
+        # zeros on the serial input of the last 165 follow the columns
+        data = (self.loaded << 8 * pad).to_bytes(len(into), 'big')
+        for i in range(len(into)):
+            into[i] = data[i]
+        self.write(buf)
+
+    def _latch(self, value):
+        if value:
+            self.outputs = self.shift  # RCLK rising edge
+        else:
+            self.loaded = 0
+            for r, c in self.pressed:
+                if self.outputs & (1 << r):
+                    self.loaded |= 1 << c
+
+
+class _FakeLatch:
+    def __init__(self, bus):
+        self.bus = bus
+
+    def value(self, v):
+        self.bus._latch(v)
+
+
+class FakeI2C:
+    '''
+    I2C bus with one MCP23017, pressed is a set of (row, col) closed keys
+    '''
+
+    def __init__(self, addr=0x20):
+        self.addr = addr
+        self.regs = bytearray(0x16)
+        self.pressed = set()
+        self.transfers = 0
+
+    def writeto_mem(self, addr, reg, buf):
+        assert addr == self.addr
+        for i in range(len(buf)):
+            self.regs[reg + i] = buf[i]
+        self.transfers += 1
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        assert addr == self.addr
+        port = 0xFF  # pulled up
+        for r, c in self.pressed:
+            if not self.regs[GPIOA] & (1 << r):
+                port &= ~(1 << c)
+        self.regs[GPIOB] = port ^ self.regs[IPOLB]
+        for i in range(len(buf)):
+            buf[i] = self.regs[reg + i]
+        self.transfers += 1
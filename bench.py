@@ -0,0 +1,78 @@
+'''
+benchmark of the matrix kernels
+
+Run on the board or on the MicroPython Unix port:
+    micropython bench.py
+Prints time and, when machine.freq() is known, CPU cycles per scan of a
+4 x 10 matrix for every kernel variant the port can compile.
+'''
+from array import array
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:  # CPython
+    from time import perf_counter_ns
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+try:
+    from machine import freq
+    FREQ = freq()
+except (ImportError, AttributeError):
+    FREQ = None
+
+ROWS = 4
+COLS = 10
+LOOPS = 2000
+
+
+def scan(k, last, busy, debounce, samples, t):
+    '''One matrix scan the way Matrix.scan drives the kernels'''
+    base = 0
+    for r in range(ROWS):
+        bits = samples[r]
+        changed = k.changes(last, busy, r, bits)
+        if busy[r]:
+            if changed:
+                k.stamp(debounce, base, changed, t)
+            k.expired(debounce, base, busy[r], t, 10)
+        base += COLS
+
+
+def run(k, name):
+    last = array('L', [0] * ROWS)
+    busy = array('L', [0] * ROWS)
+    debounce = array('L', [0] * (ROWS * COLS))
+    idle = (0, 0, 0, 0)
+    typing = (0b0000000001, 0, 0b0000100000, 0)
+    for label, samples in (('idle', idle), ('typing', typing)):
+        start = ticks_us()
+        for t in range(LOOPS):
+            if samples is typing and t & 1:
+                scan(k, last, busy, debounce, idle, t)
+            else:
+                scan(k, last, busy, debounce, samples, t)
+        report(name, 'scan ' + label, ticks_diff(ticks_us(), start))
+
+
+def report(name, label, us):
+    per = us / LOOPS
+    if FREQ:
+        print('{:7} {:12} {:8.2f} us {:8.0f} cycles'.format(name, label, per, per * FREQ / 1000000))
+    else:
+        print('{:7} {:12} {:8.2f} us'.format(name, label, per))
+
+
+import kernels
+run(kernels, 'python')
+for name in ('native', 'viper'):
+    try:
+        k = __import__('kernels_' + name)
+    except Exception as e:
+        print('{:7} not available: {}'.format(name, e))
+        continue
+    run(k, name)
@@ -0,0 +1,169 @@
+'''chords of keys pressed together, decided without blocking the main loop'''
+from array import array
+from time import ticks_diff
+
+
+class Combos:
+    '''
+    Combos of 2 to N keys, each with its own timeout
+
+    index[key] is the bitmask of the combos holding key, so a press
+    narrows the candidates with one AND. Presses that may still be part
+    of a combo are buffered:
+        fire    the buffered keys complete a combo and no bigger combo is
+                a candidate, or the bigger ones time out first
+        flush   a key outside every candidate is pressed, a buffered key
+                is released or all candidates time out, the buffered
+                events go to handle(event, t) in order
+    fire(n) is called for combo n, the releases of its keys are dropped.
+    Keep under 30 combos so the masks stay small ints.
+
+    Nothing here waits: call poll() from the main loop and sleep at most
+    timeout() ms.
+    '''
+
+    def __init__(self, keys, handle, fire, timeout=50):
+        self.handle = handle
+        self.fire = fire
+        self.timeout_ms = timeout
+        self.index = [0] * keys  # key -> combos holding it
+        self.by_size = [0]  # number of keys -> combos of that size
+        self.timeouts = []
+        self.count = 0
+        self.events = bytearray(0)
+        self.times = array('L')
+        self.length = 0
+        self.candidates = 0
+        self.consumed = bytearray(keys)  # keys of a fired combo, still down
+
+    def combo(self, keys, timeout=None):
+        '''
+        Add a combo of keys, fired when all of them are pressed within
+        timeout ms of the first one
+
+        Returns:
+            combo number passed to fire()
+        '''
+        n = self.count
+        bit = 1 << n
+        for key in keys:
+            self.index[key] |= bit
+        size = len(keys)
+        while len(self.by_size) <= size:
+            self.by_size.append(0)
+        self.by_size[size] |= bit
+        self.timeouts.append(self.timeout_ms if timeout is None else timeout)
+        if size > len(self.events):
+            self.events = bytearray(size)
+            self.times = array('L', [0] * size)
+        self.count += 1
+        return n
+
+    @property
+    def pending(self):
+        return self.length > 0
+
+    def add(self, event, t):
+        '''
+        Take event at t if it may belong to a combo
+
+        Returns:
+            False when the caller handles event
+        '''
+        key = event & 0x7F
+        if event & 0x80:
+            if self.consumed[key]:
+                self.consumed[key] = 0
+                return True
+            if self.length:
+                # released before the combo completed
+                self.flush()
+            return False
+        if self.length:
+            candidates = self.candidates & self.index[key]
+            if not candidates:
+                self.flush()
+        if not self.length:
+            candidates = self.index[key]
+            if not candidates:
+                return False
+        self.events[self.length] = event
+        self.times[self.length] = t
+        self.length += 1
+        self.candidates = candidates
+        self._check(t)
+        return True
+
+    def poll(self, t):
+        '''
+        Fire or flush when the candidates time out
+        '''
+        if self.length:
+            self._check(t)
+
+    def timeout(self, t):
+        '''
+        Returns:
+            ms until the next candidate times out, -1 when none
+        '''
+        if not self.length:
+            return -1
+        elapsed = ticks_diff(t, self.times[0])
+        length = self.length
+        complete = self.by_size[length] if length < len(self.by_size) else 0
+        left = -1
+        for n in range(self.count):
+            if (self.candidates >> n) & 1:
+                ms = self.timeouts[n] - elapsed
+                if ms <= 0:
+                    if complete & (1 << n):
+                        # timed out and kept, waits for a bigger combo
+                        continue
+                    ms = 0  # dropped by the next poll()
+                if left < 0 or ms < left:
+                    left = ms
+        return left
+
+    def flush(self):
+        '''
+        Pass the buffered events on, no combo
+        '''
+        length = self.length
+        self.length = 0
+        self.candidates = 0
+        for i in range(length):
+            self.handle(self.events[i], self.times[i])
+
+    def clear(self):
+        '''Drop the buffered presses, fired keys still swallow their releases'''
+        self.length = 0
+        self.candidates = 0
+
+    def _check(self, t):
+        elapsed = ticks_diff(t, self.times[0])
+        length = self.length
+        complete = self.by_size[length] if length < len(self.by_size) else 0
+        candidates = self.candidates
+        # drop the combos that timed out, the ones completed by the
+        # buffered keys stay until a bigger candidate gives up
+        for n in range(self.count):
+            bit = 1 << n
+            if candidates & bit and elapsed >= self.timeouts[n]:
+                if not complete & bit or ticks_diff(self.times[length - 1], self.times[0]) > self.timeouts[n]:
+                    candidates &= ~bit
+        self.candidates = candidates
+        complete &= candidates
+        if complete and complete == candidates:
+            self._fire(complete)
+        elif not candidates:
+            self.flush()
+
+    def _fire(self, complete):
+        n = 0
+        while not (complete >> n) & 1:
+            n += 1
+        for i in range(self.length):
+            self.consumed[self.events[i] & 0x7F] = 1
+        self.length = 0
+        self.candidates = 0
+        self.fire(n)
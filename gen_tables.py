@@ -0,0 +1,250 @@
+'''
+build the key name and host layout tables, runs on the host
+
+    python gen_tables.py [-o keynames.py] [-l layouts.py]
+
+Collects every key and action name of keycode.py and action_code.py
+into keynames.py: sorted names, their offsets and their 16 bit codes
+as bytes literals. Frozen into the firmware the tables stay in flash,
+so name lookups no longer need those modules imported.
+
+Builds layouts.py, the character to key tables sendtext.py types with, from
+ASCII_TO_KEYCODE for a US host and from the key rows below for the
+other host layouts.
+'''
+import struct
+import sys
+
+import action_code
+import keycode
+
+TEMPLATE = """\
+'''
+key name <-> code lookup, generated by gen_tables.py, do not edit
+
+Tables are bytes, frozen they stay in flash. Lookups are meant for the
+rare runtime uses like key names in logs, not for the key path.
+'''
+# names sorted, joined by newline
+NAMES = (
+{names})
+# u16 offset of every name in NAMES, little endian
+OFFSETS = (
+{offsets})
+# u16 code of every name, little endian
+CODES = (
+{codes})
+COUNT = {count}
+
+
+def _name(i):
+    start = OFFSETS[2 * i] | (OFFSETS[2 * i + 1] << 8)
+    end = NAMES.find(b'\\n', start)
+    return NAMES[start:end if end >= 0 else len(NAMES)]
+
+
+def code(name):
+    '''
+    Returns:
+        code of key or action name, None when unknown
+    '''
+    target = name.encode()
+    lo = 0
+    hi = COUNT
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _name(mid) < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < COUNT and _name(lo) == target:
+        return CODES[2 * lo] | (CODES[2 * lo + 1] << 8)
+    return None
+
+
+def name(code):
+    '''
+    Returns:
+        first name of code in alphabetic order, hex code when unknown
+    '''
+    for i in range(COUNT):
+        if CODES[2 * i] | (CODES[2 * i + 1] << 8) == code:
+            return _name(i).decode()
+    return hex(code)
+"""
+
+
+def collect():
+    '''
+    Returns:
+        dict of name -> 16 bit code
+    '''
+    table = {}
+    for name, value in vars(keycode).items():
+        if name.startswith('KC_') and type(value) is int:
+            table[name] = value
+    for name, value in vars(action_code).items():
+        if not name.isupper() or name.startswith('ACT_') or name.startswith('OP_'):
+            continue
+        if name.startswith('ON_') or name == 'ASCII_TO_KEYCODE':
+            continue
+        if type(value) is int or (type(value) is str and len(value) == 1):
+            table[name] = action_code.get_action_code(value)
+    return table
+
+
+def literal(blob):
+    return ''.join('    {!r}\n'.format(blob[i:i + 16]) for i in range(0, len(blob), 16))
+
+
+def generate(table):
+    names = sorted(table)
+    offsets = []
+    position = 0
+    for name in names:
+        offsets.append(position)
+        position += len(name) + 1
+    return TEMPLATE.format(
+        names=literal('\n'.join(names).encode()),
+        offsets=literal(struct.pack('<{}H'.format(len(names)), *offsets)),
+        codes=literal(struct.pack('<{}H'.format(len(names)), *(table[n] for n in names))),
+        count=len(names),
+    )
+
+
+LAYOUTS_TEMPLATE = """\
+'''
+host keyboard layouts for sendtext.py, generated by gen_tables.py, do not edit
+
+A layout is (codes, extra, altgr, dead):
+    codes   bytes, keycode | 0x80 with shift, of ASCII character c at
+            codes[c] and of character extra[i] at codes[128 + i], 0 when
+            the layout cannot type it
+    extra   str of the non ASCII characters
+    altgr   bytes, bit i & 7 of byte i >> 3 set when code i needs AltGr
+    dead    bytes, same bits for dead keys, typed as the key then space
+'''
+{layouts}
+LAYOUTS = {{
+{names}}}
+"""
+
+# characters of a key (normal, shift, AltGr), '' when none
+LETTERS = {0x04 + i: (chr(0x61 + i), chr(0x41 + i), '') for i in range(26)}
+
+DE = dict(LETTERS)
+DE.update({
+    0x1C: ('z', 'Z', ''), 0x1D: ('y', 'Y', ''),
+    0x14: ('q', 'Q', '@'), 0x08: ('e', 'E', '€'), 0x10: ('m', 'M', 'µ'),
+    0x1E: ('1', '!', ''), 0x1F: ('2', '"', '²'), 0x20: ('3', '§', '³'),
+    0x21: ('4', '$', ''), 0x22: ('5', '%', ''), 0x23: ('6', '&', ''),
+    0x24: ('7', '/', '{'), 0x25: ('8', '(', '['), 0x26: ('9', ')', ']'),
+    0x27: ('0', '=', '}'), 0x2D: ('ß', '?', '\\'), 0x2E: ('´', '`', ''),
+    0x2F: ('ü', 'Ü', ''), 0x30: ('+', '*', '~'), 0x32: ('#', "'", ''),
+    0x33: ('ö', 'Ö', ''), 0x34: ('ä', 'Ä', ''), 0x35: ('^', '°', ''),
+    0x36: (',', ';', ''), 0x37: ('.', ':', ''), 0x38: ('-', '_', ''),
+    0x64: ('<', '>', '|'),
+})
+DE_DEAD = '´`^'
+
+FR = dict(LETTERS)
+FR.update({
+    0x04: ('q', 'Q', ''), 0x14: ('a', 'A', ''), 0x1A: ('z', 'Z', ''),
+    0x1D: ('w', 'W', ''), 0x33: ('m', 'M', ''), 0x10: (',', '?', ''),
+    0x08: ('e', 'E', '€'),
+    0x1E: ('&', '1', ''), 0x1F: ('é', '2', '~'), 0x20: ('"', '3', '#'),
+    0x21: ("'", '4', '{'), 0x22: ('(', '5', '['), 0x23: ('-', '6', '|'),
+    0x24: ('è', '7', '`'), 0x25: ('_', '8', '\\'), 0x26: ('ç', '9', '^'),
+    0x27: ('à', '0', '@'), 0x2D: (')', '°', ']'), 0x2E: ('=', '+', '}'),
+    0x2F: ('^', '¨', ''), 0x30: ('$', '£', '¤'), 0x32: ('*', 'µ', ''),
+    0x34: ('ù', '%', ''), 0x35: ('²', '', ''), 0x36: (';', '.', ''),
+    0x37: (':', '/', ''), 0x38: ('!', '§', ''), 0x64: ('<', '>', ''),
+})
+FR_DEAD = '~`¨'  # ^ is dead on its own key, typed with AltGr 9 instead
+
+UK = dict(LETTERS)
+UK.update({
+    0x1E: ('1', '!', ''), 0x1F: ('2', '"', ''), 0x20: ('3', '£', ''),
+    0x21: ('4', '$', '€'), 0x22: ('5', '%', ''), 0x23: ('6', '^', ''),
+    0x24: ('7', '&', ''), 0x25: ('8', '*', ''), 0x26: ('9', '(', ''),
+    0x27: ('0', ')', ''), 0x2D: ('-', '_', ''), 0x2E: ('=', '+', ''),
+    0x2F: ('[', '{', ''), 0x30: (']', '}', ''), 0x32: ('#', '~', ''),
+    0x33: (';', ':', ''), 0x34: ("'", '@', ''), 0x35: ('`', '¬', ''),
+    0x36: (',', '<', ''), 0x37: ('.', '>', ''), 0x38: ('/', '?', ''),
+    0x64: ('\\', '|', ''),
+})
+UK_DEAD = ''
+
+HOST_LAYOUTS = (('de', DE, DE_DEAD), ('fr', FR, FR_DEAD), ('uk', UK, UK_DEAD))
+
+
+def us_layout():
+    return (bytes(action_code.ASCII_TO_KEYCODE), '', bytes(16), bytes(16))
+
+
+def build_layout(keys, dead):
+    '''
+    Returns:
+        layout tuple of keys, dict of keycode -> (normal, shift, AltGr)
+    '''
+    table = {}  # character -> (code, altgr)
+    for c in range(0x20):
+        # control keys are the same on every layout
+        if action_code.ASCII_TO_KEYCODE[c]:
+            table[chr(c)] = (action_code.ASCII_TO_KEYCODE[c], False)
+    table[' '] = (0x2C, False)
+    table['\x7f'] = (action_code.ASCII_TO_KEYCODE[0x7F], False)
+    for keycode in sorted(keys):
+        normal, shift, altgr = keys[keycode]
+        for c, code, alt in ((normal, keycode, False), (shift, keycode | 0x80, False),
+                             (altgr, keycode, True)):
+            # the first key of a character wins, plain before AltGr
+            if c and c not in table:
+                table[c] = (code, alt)
+    extra = ''.join(sorted(c for c in table if ord(c) >= 0x80))
+    codes = bytearray(128 + len(extra))
+    flags = (bytearray((len(codes) + 7) // 8), bytearray((len(codes) + 7) // 8))
+    for c, (code, alt) in table.items():
+        i = ord(c) if ord(c) < 0x80 else 128 + extra.index(c)
+        codes[i] = code
+        for bits, flag in zip(flags, (alt, c in dead)):
+            if flag:
+                bits[i >> 3] |= 1 << (i & 7)
+    return (bytes(codes), extra, bytes(flags[0]), bytes(flags[1]))
+
+
+def generate_layouts():
+    layouts = [('us', us_layout())]
+    layouts += [(name, build_layout(keys, dead)) for name, keys, dead in HOST_LAYOUTS]
+    parts = []
+    for name, (codes, extra, altgr, dead) in layouts:
+        parts.append('{} = (\n{},\n    {!r},\n{},\n{},\n)'.format(
+            name.upper(), literal(codes).rstrip('\n'), extra,
+            literal(altgr).rstrip('\n'), literal(dead).rstrip('\n')))
+    return LAYOUTS_TEMPLATE.format(
+        layouts='\n'.join(parts),
+        names=''.join('    {!r}: {},\n'.format(name, name.upper()) for name, _ in layouts),
+    ), len(layouts)
+
+
+def main(argv):
+    output = 'keynames.py'
+    layouts = 'layouts.py'
+    while argv:
+        if argv[0] == '-o':
+            output = argv[1]
+        elif argv[0] == '-l':
+            layouts = argv[1]
+        argv = argv[2:]
+    table = collect()
+    with open(output, 'w') as f:
+        f.write(generate(table))
+    print('{}: {} names'.format(output, len(table)))
+    text, count = generate_layouts()
+    with open(layouts, 'w') as f:
+        f.write(text)
+    print('{}: {} layouts'.format(layouts, count))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+'''adaptive scan rate of the keyboard matrix'''
+from time import ticks_ms, ticks_diff
+
+
+class Governor:
+    '''
+    Pick the matrix scan period from the time since the last activity
+
+    Scans at full rate while keys are active, steps down through the
+    tiers as the keyboard stays quiet and returns to full rate on the
+    first change.
+    '''
+
+    # (scan period ms, quiet ms before entering the tier)
+    TIERS = ((1, 0), (4, 1000), (20, 10000))  # 1 kHz, 250 Hz, 50 Hz
+
+    def __init__(self, tiers=TIERS):
+        self.tiers = tiers
+        self.tier = 0  # current tier
+        self.tier_ms = [0] * len(tiers)  # time spent in finished tier visits
+        self._active = self._since = ticks_ms()
+
+    def update(self, active, time_ms=None):
+        '''
+        Feed the result of a scan
+
+        Args:
+            active: a key is down or changing
+            time_ms: ticks_ms() of the scan
+
+        Returns:
+            period [ms] until the next scan
+        '''
+        if time_ms is None:
+            time_ms = ticks_ms()
+        if active:
+            self._active = time_ms
+            if self.tier:
+                self._enter(0, time_ms)
+        else:
+            quiet = ticks_diff(time_ms, self._active)
+            tier = self.tier
+            while tier + 1 < len(self.tiers) and quiet >= self.tiers[tier + 1][1]:
+                tier += 1
+            if tier != self.tier:
+                self._enter(tier, time_ms)
+        return self.tiers[self.tier][0]
+
+    def _enter(self, tier, time_ms):
+        self.tier_ms[self.tier] += ticks_diff(time_ms, self._since)
+        self._since = time_ms
+        self.tier = tier
+
+    @property
+    def period(self):
+        '''current scan period [ms]'''
+        return self.tiers[self.tier][0]
+
+    @property
+    def rate(self):
+        '''current scan rate [Hz]'''
+        return 1000 // self.tiers[self.tier][0]
+
+    def tier_time(self):
+        '''
+        Returns:
+            list of ms spent in each tier, including the current visit
+        '''
+        times = list(self.tier_ms)
+        times[self.tier] += ticks_diff(ticks_ms(), self._since)
+        return times
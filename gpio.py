@@ -0,0 +1,125 @@
+'''read all columns of the keyboard matrix at once'''
+from sys import platform
+
+try:
+    from machine import mem32
+except ImportError:  # host
+    mem32 = None
+
+GPIO_IN_REG = 0x3FF4403C  # ESP32 GPIO 0-31 input
+GPIO_IN1_REG = 0x3FF44040  # ESP32 GPIO 32-39 input
+
+
+class PinColumns:
+    '''
+    Read columns with one Pin.value() call per column
+    '''
+
+    def __init__(self, cols):
+        self.cols = cols
+
+    def read(self):
+        '''
+        Returns:
+            packed int, bit n set when column n is high
+        '''
+        bits = 0
+        mask = 1
+        for col in self.cols:
+            if col.value():
+                bits |= mask
+            mask <<= 1
+        return bits
+
+
+class PortColumns:
+    '''
+    Read columns with one load of each ESP32 GPIO input register
+
+    Columns whose pin number minus column number is the same move
+    together, so each register needs one mask and shift per offset:
+    pins (13, 15, 2, 34, 4, 25, 26, 27, 14, 12) take 7 mask/shift pairs
+    from 2 loads.
+    '''
+
+    def __init__(self, pins, mem=None):
+        self.mem = mem32 if mem is None else mem
+        self.table = port_table(pins)
+
+    def read(self):
+        '''
+        Returns:
+            packed int, bit n set when column n is high
+        '''
+        mem = self.mem
+        bits = 0
+        for reg, shifts in self.table:
+            value = mem[reg]
+            for mask, right, left in shifts:
+                bits |= (value & mask) >> right << left
+        return bits
+
+
+def port_table(pins):
+    '''
+    Precompute register, mask and shift groups for the column pins
+
+    Returns:
+        ((reg, ((mask, right shift, left shift), ...)), ...)
+    '''
+    groups = {}
+    for col, pin in enumerate(pins):
+        if pin < 32:
+            reg, bit = GPIO_IN_REG, pin
+        else:
+            reg, bit = GPIO_IN1_REG, pin - 32
+        shifts = groups.setdefault(reg, {})
+        offset = bit - col
+        shifts[offset] = shifts.get(offset, 0) | (1 << bit)
+    table = []
+    for reg in sorted(groups):
+        shifts = groups[reg]
+        table.append((reg, tuple(
+            (mask, max(offset, 0), max(-offset, 0))
+            for offset, mask in sorted(shifts.items()))))
+    return tuple(table)
+
+
+def columns(pins, cols):
+    '''
+    Pick the fastest column reader for this port
+
+    Args:
+        pins: column pin numbers
+        cols: column Pin objects, used by the fallback
+    '''
+    if platform == 'esp32' and mem32 is not None:
+        return PortColumns(pins)
+    return PinColumns(cols)
+
+
+class FakeMem32:
+    '''
+    Stand-in for machine.mem32 with the two GPIO input registers, for
+    testing PortColumns on a host
+    '''
+
+    def __init__(self):
+        self.regs = {GPIO_IN_REG: 0, GPIO_IN1_REG: 0}
+
+    def __getitem__(self, addr):
+        return self.regs[addr]
+
+    def __setitem__(self, addr, value):
+        self.regs[addr] = value & 0xFFFFFFFF
+
+    def pin(self, pin, value):
+        '''Set input level of GPIO pin'''
+        if pin < 32:
+            reg, bit = GPIO_IN_REG, pin
+        else:
+            reg, bit = GPIO_IN1_REG, pin - 32
+        if value:
+            self.regs[reg] |= 1 << bit
+        else:
+            self.regs[reg] &= ~(1 << bit)
@@ -1,18 +1,95 @@
 import struct
 
-def find_device(devices, usage_page, usage):
+# N-key rollover report: modifiers, then one bit per keycode 0x00-0xDF
+NKRO_KEYS = 0xE0
+NKRO_SIZE = 1 + NKRO_KEYS // 8
+# reports, index of HID.report_devices and of the queue buffers
+KEYBOARD = 0
+NKRO_KEYBOARD = 1
+CONSUMER = 2
+MOUSE = 3
+REPORT_SIZES = (8, NKRO_SIZE, 2, 4)
+
+def find_device(devices, usage_page, usage, report_length=None):
+    # devices without report_length send the 8 byte boot keyboard report
     for device in devices:
         if (
             device.usage_page == usage_page
             and device.usage == usage
             and hasattr(device, "send_report")
+            and (
+                report_length is None
+                or getattr(device, "report_length", 8) == report_length
+            )
         ):
             return device
     raise ValueError("Not found")
 
+class ReportDevice:
+    """
+    HID device keeping its last report, where no USB or BLE HID is available
+    """
+    def __init__(self, usage_page, usage, size):
+        self.usage_page = usage_page
+        self.usage = usage
+        self.report_length = size
+        self.last_report = bytearray(size)
+        self.reports = 0
+    def send_report(self, report):
+        last_report = self.last_report
+        for i in range(len(last_report)):
+            last_report[i] = report[i]
+        self.reports += 1
+
+def report_devices(nkro=False):
+    devices = (
+        ReportDevice(0x1, 0x06, 8),  # keyboard
+        ReportDevice(0x0C, 0x01, 2),  # consumer control
+        ReportDevice(0x1, 0x02, 4),  # mouse
+    )
+    if nkro:
+        devices += (ReportDevice(0x1, 0x06, NKRO_SIZE),)  # keyboard bitmap
+    return devices
+
 class HID:
-    def __init__(self, devices):
-        self.keyboard = find_device(devices, usage_page=0x1, usage=0x06)
+    """
+    Keyboard, consumer control and mouse reports
+
+    Keys go to the 6KRO boot report, or to the NKRO bitmap report when
+    devices has a keyboard with report_length NKRO_SIZE. The boot report
+    holds six keys and drops the rest, in the bitmap a key is one bit.
+    set_boot_protocol() switches between them when the host asks,
+    main_v1.Keyboard.check() calls it with the BLE protocol mode.
+
+    Between begin() and end() the key changes of one tick build a single
+    report, sent by the outermost end(). A key pressed and released, or
+    released and pressed again, within the tick sends the report in
+    between so the host sees both. A report equal to the last one sent
+    is not sent.
+
+    With a queue_size, reports wait in a ring of queue_size reports in
+    the order they were made and drain() sends them, so a slow or
+    failing transport does not hold up the caller. A failed report
+    stays queued for the next drain(). When the ring is full the new
+    report replaces the newest queued report of the same device if that
+    loses no press, no release and no order of presses, otherwise the
+    oldest report is sent right away: the caller waits for the
+    transport. If that fails too the new report waits for room, and so
+    do the reports made after it. Once there is room the latest report
+    of each waiting device is queued in the order they waited, ahead of
+    anything newer, so no release is lost and devices keep their order.
+    release_all() skips the queue, its reports are sent before it
+    returns.
+    """
+    def __init__(self, devices, queue_size=0):
+        self.keyboard = find_device(devices, usage_page=0x1, usage=0x06, report_length=8)
+        try:
+            self.nkro_keyboard = find_device(
+                devices, usage_page=0x1, usage=0x06, report_length=NKRO_SIZE
+            )
+        except ValueError:
+            self.nkro_keyboard = None
+        self.nkro = self.nkro_keyboard is not None
         self.consumer_control = find_device(devices, usage_page=0x0C, usage=0x01)
         self.mouse = find_device(devices, usage_page=0x1, usage=0x02)
         self.consumer_report = bytearray(2)
@@ -21,7 +98,40 @@ class HID:
         # report[2:] regular keys
         self.report = bytearray(8)
         self.report_keys = memoryview(self.report)[2:]
+        # nkro_report[0] modifiers
+        # nkro_report[1:] bit keycode & 7 of byte keycode >> 3
+        self.nkro_report = bytearray(NKRO_SIZE)
+        self.nkro_bits = memoryview(self.nkro_report)[1:]
+        # last reports sent to the host
+        self.sent_report = bytearray(8)
+        self.sent_nkro_report = bytearray(NKRO_SIZE)
+        self.consumer_usage = 0
+        self.batch = 0  # depth of begin() ... end()
+        self.dirty = False  # keys changed since the last report
+        self.reports = 0
+        self.suppressed = 0
         self.mouse_report = bytearray(4)
+        self.report_devices = (
+            self.keyboard, self.nkro_keyboard, self.consumer_control, self.mouse
+        )
+        # ring of reports, the buffers of each report by slot
+        self.queue_size = queue_size
+        self.queue = tuple(
+            tuple(bytearray(size) for _ in range(queue_size)) for size in REPORT_SIZES
+        )
+        self.queue_reports = bytearray(queue_size)  # report of each slot
+        self.head = 0
+        self.length = 0
+        # last reports the transport took, to check merges against
+        self.delivered = tuple(bytearray(size) for size in REPORT_SIZES)
+        self.merged = 0
+        self.failures = 0
+        # reports not queued, the ring was full: kinds, oldest first
+        self.unsent = bytearray(len(REPORT_SIZES))
+        self.unsent_count = 0
+        self.current_reports = (
+            self.report, self.nkro_report, self.consumer_report, self.mouse_report
+        )
         for device in devices:
             if (
                 device.usage_page == 0x1
@@ -32,63 +142,329 @@ class HID:
                 break
         else:
             self._leds = None
+    def begin(self):
+        """Collect key changes until end(), pairs nest"""
+        self.batch += 1
+    def end(self):
+        """
+        Send the report of the key changes since the outermost begin(),
+        if any
+        """
+        if self.batch:
+            self.batch -= 1
+        if not self.batch and self.dirty:
+            self._flush()
     def press(self, *keycodes):
-        for keycode in keycodes:
-            if 0xE0 <= keycode and keycode < 0xE8:
-                self.report[0] |= 1 << (keycode & 0x7)
-                continue
-            for c in self.report_keys:
-                if c == keycode:
-                    break
-            else:
-                for i in range(6):
-                    if self.report_keys[i] == 0:
-                        self.report_keys[i] = keycode
-                        break
-        self.keyboard.send_report(self.report)
+        self.press_keys(keycodes)
     def release(self, *keycodes):
-        for keycode in keycodes:
-            if 0xE0 <= keycode and keycode < 0xE8:
-                self.report[0] &= ~(1 << (keycode & 0x7))
-                continue
-            for i in range(6):
-                if self.report_keys[i] == keycode:
-                    self.report_keys[i] = 0
-        self.keyboard.send_report(self.report)
+        self.release_keys(keycodes)
+    def press_keys(self, keycodes, keycode=0):
+        # keycodes is a sequence, keycode an extra key sent in the same
+        # report, no *args so that the keypress path does not allocate
+        for i in range(len(keycodes)):
+            self._add(keycodes[i])
+        if keycode:
+            self._add(keycode)
+        self._send_keys()
+    def release_keys(self, keycodes, keycode=0):
+        for i in range(len(keycodes)):
+            self._remove(keycodes[i])
+        if keycode:
+            self._remove(keycode)
+        self._send_keys()
+    def set_boot_protocol(self, boot):
+        """
+        Send the 6KRO boot report when the host asks for the boot
+        protocol (BIOS, boot loaders), the NKRO report otherwise, keys
+        held stay pressed
+        """
+        nkro = not boot and self.nkro_keyboard is not None
+        if nkro == self.nkro:
+            return
+        if self.dirty:
+            self._flush()
+        if nkro:
+            self.nkro_report[0] = self.report[0]
+            for keycode in self.report_keys:
+                if keycode:
+                    self.nkro_bits[keycode >> 3] |= 1 << (keycode & 0x7)
+            self._clear(self.report)
+        else:
+            self.report[0] = self.nkro_report[0]
+            self.nkro = False
+            for keycode in range(NKRO_KEYS):
+                if self.nkro_bits[keycode >> 3] & (1 << (keycode & 0x7)):
+                    self._add(keycode)
+            self._clear(self.nkro_report)
+        self.nkro = nkro
+        self._flush(True)
+    def _send_keys(self):
+        if self.batch:
+            self.dirty = True
+        else:
+            self._flush()
+    def _flush(self, force=False, queue=True):
+        self.dirty = False
+        if self.nkro:
+            kind, report, sent = NKRO_KEYBOARD, self.nkro_report, self.sent_nkro_report
+        else:
+            kind, report, sent = KEYBOARD, self.report, self.sent_report
+        if not force and report == sent:
+            self.suppressed += 1
+            return
+        for i in range(len(report)):
+            sent[i] = report[i]
+        self._send(kind, report, queue)
+    def _send(self, kind, report, queue=True):
+        self.reports += 1
+        if self.queue_size and queue:
+            self._push(kind, report)
+            return
+        self.report_devices[kind].send_report(report)
+        if self.queue_size:
+            delivered = self.delivered[kind]
+            for j in range(len(report)):
+                delivered[j] = report[j]
+    @property
+    def pending(self):
+        """Number of queued reports, and of reports waiting for room"""
+        return self.length + self.unsent_count
+    def drain(self, count=1):
+        """
+        Send up to count queued reports, stop at a transport error
+
+        Returns:
+            number of reports still queued
+        """
+        while self.length and count > 0:
+            try:
+                self._send_head()
+            except Exception as e:
+                self.failures += 1
+                print(e)
+                break
+            count -= 1
+        self._requeue()
+        return self.pending
+    def _send_head(self):
+        i = self.head
+        kind = self.queue_reports[i]
+        report = self.queue[kind][i]
+        self.report_devices[kind].send_report(report)
+        delivered = self.delivered[kind]
+        for j in range(len(report)):
+            delivered[j] = report[j]
+        self.head = (i + 1) % self.queue_size
+        self.length -= 1
+    def _push(self, kind, report):
+        size = self.queue_size
+        if self.unsent_count:
+            # older reports wait for room, this one goes after them
+            self._wait(kind)
+            if self.length == size:
+                try:
+                    self._send_head()
+                except Exception as e:
+                    self.failures += 1
+                    print(e)
+                    return
+            self._requeue()
+            return
+        if self.length == size:
+            tail = (self.head + size - 1) % size
+            if self.queue_reports[tail] == kind and self._mergeable(kind, tail, report):
+                buffer = self.queue[kind][tail]
+                for j in range(len(report)):
+                    buffer[j] = report[j]
+                self.merged += 1
+                return
+            # full, wait for the transport
+            try:
+                self._send_head()
+            except Exception as e:
+                # keep it for drain(), the report may release keys
+                self.failures += 1
+                self._wait(kind)
+                print(e)
+                return
+        self._put(kind, report)
+    def _wait(self, kind):
+        # the latest report of kind waits for room, behind the others
+        order = self.unsent
+        n = 0
+        for i in range(self.unsent_count):
+            if order[i] != kind:
+                order[n] = order[i]
+                n += 1
+        order[n] = kind
+        self.unsent_count = n + 1
+    def _requeue(self):
+        # queue the waiting reports, oldest first, while there is room
+        order = self.unsent
+        count = self.unsent_count
+        n = 0
+        while n < count and self.length < self.queue_size:
+            kind = order[n]
+            self._put(kind, self.current_reports[kind])
+            n += 1
+        for i in range(n, count):
+            order[i - n] = order[i]
+        self.unsent_count = count - n
+    def _put(self, kind, report):
+        size = self.queue_size
+        i = (self.head + self.length) % size
+        self.queue_reports[i] = kind
+        buffer = self.queue[kind][i]
+        for j in range(len(report)):
+            buffer[j] = report[j]
+        self.length += 1
+    def _mergeable(self, kind, tail, report):
+        # the host may skip the tail report when every key of it is as
+        # in the report before it or as in the new report
+        if kind == MOUSE:
+            return False  # movements add up, keep them all
+        size = self.queue_size
+        prev = self.delivered[kind]
+        i = tail
+        for _ in range(self.length - 1):
+            i = (i + size - 1) % size
+            if self.queue_reports[i] == kind:
+                prev = self.queue[kind][i]
+                break
+        last = self.queue[kind][tail]
+        if kind == CONSUMER:
+            return last == prev or last == report
+        # a key pressed in the tail must not come with a later press or
+        # another modifier, both change what the host types
+        pressed = 0
+        presses = report[0] != last[0]
+        for j in range(len(last)):
+            value = last[j]
+            if kind == KEYBOARD and j >= 2:
+                # key slots, one keycode each
+                if value != prev[j] and value != report[j]:
+                    return False
+                if value and value != prev[j]:
+                    pressed = 1
+                if report[j] and report[j] != value:
+                    presses = 1
+            else:
+                if (value ^ prev[j]) & (value ^ report[j]):
+                    return False
+                if value & ~prev[j]:
+                    pressed = 1
+                if report[j] & ~value:
+                    presses = 1
+        return not (pressed and presses)
+    def _has(self, report, keycode):
+        if self.nkro:
+            if keycode < NKRO_KEYS:
+                return (report[1 + (keycode >> 3)] >> (keycode & 0x7)) & 1
+            return (report[0] >> (keycode & 0x7)) & 1
+        if 0xE0 <= keycode and keycode < 0xE8:
+            return (report[0] >> (keycode & 0x7)) & 1
+        for i in range(2, 8):
+            if report[i] == keycode:
+                return 1
+        return 0
+    def _pending(self, keycode, pressed):
+        # keycode pressed (pressed=True) or released in this tick, not
+        # sent yet
+        if self.nkro:
+            report, sent = self.nkro_report, self.sent_nkro_report
+        else:
+            report, sent = self.report, self.sent_report
+        return (
+            self._has(report, keycode) == pressed
+            and self._has(sent, keycode) != pressed
+        )
+    def _clear(self, report):
+        for i in range(len(report)):
+            report[i] = 0
+    def _add(self, keycode):
+        if self.dirty and self._pending(keycode, False):
+            # released in this tick, let the host see the release
+            self._flush()
+        if self.nkro:
+            if keycode < NKRO_KEYS:
+                self.nkro_bits[keycode >> 3] |= 1 << (keycode & 0x7)
+            elif keycode < 0xE8:
+                self.nkro_report[0] |= 1 << (keycode & 0x7)
+            return
+        if 0xE0 <= keycode and keycode < 0xE8:
+            self.report[0] |= 1 << (keycode & 0x7)
+            return
+        report_keys = self.report_keys
+        for i in range(6):
+            if report_keys[i] == keycode:
+                return
+        for i in range(6):
+            if report_keys[i] == 0:
+                report_keys[i] = keycode
+                return
+    def _remove(self, keycode):
+        if self.dirty and self._pending(keycode, True):
+            # pressed in this tick, let the host see the press
+            self._flush()
+        if self.nkro:
+            if keycode < NKRO_KEYS:
+                self.nkro_bits[keycode >> 3] &= ~(1 << (keycode & 0x7))
+            elif keycode < 0xE8:
+                self.nkro_report[0] &= ~(1 << (keycode & 0x7))
+            return
+        if 0xE0 <= keycode and keycode < 0xE8:
+            self.report[0] &= ~(1 << (keycode & 0x7))
+            return
+        report_keys = self.report_keys
+        for i in range(6):
+            if report_keys[i] == keycode:
+                report_keys[i] = 0
     def send(self, *keycodes):
         self.press(*keycodes)
-        for i in range(8):
-            self.report[i] = 0
-        self.keyboard.send_report(self.report)
+        if self.dirty:
+            self._flush()
+        self._clear(self.nkro_report if self.nkro else self.report)
+        self._send_keys()
     def send_consumer(self, keycode):
+        if keycode == self.consumer_usage:
+            self.suppressed += 1
+            return
+        self.consumer_usage = keycode
         struct.pack_into("<H", self.consumer_report, 0, keycode)
-        self.consumer_control.send_report(self.consumer_report)
+        self._send(CONSUMER, self.consumer_report)
     def press_mouse(self, buttons):
         self.mouse_report[0] |= buttons
         self.mouse_report[1] = 0
         self.mouse_report[2] = 0
         self.mouse_report[3] = 0
-        self.mouse.send_report(self.mouse_report)
+        self._send(MOUSE, self.mouse_report)
     def release_mouse(self, buttons):
         self.mouse_report[0] &= ~buttons
         self.mouse_report[1] = 0
         self.mouse_report[2] = 0
         self.mouse_report[3] = 0
-        self.mouse.send_report(self.mouse_report)
+        self._send(MOUSE, self.mouse_report)
     def move_mouse(self, x=0, y=0, wheel=0):
         self.mouse_report[1] = x & 0xFF
         self.mouse_report[2] = y & 0xFF
         self.mouse_report[3] = wheel & 0xFF
-        self.mouse.send_report(self.mouse_report)
+        self._send(MOUSE, self.mouse_report)
     def release_all(self):
         try:
-            self.send_consumer(0)
-            for i in range(8):
-                self.report[i] = 0
-            self.keyboard.send_report(self.report)
+            # queued reports are stale, the host gets all keys released
+            # before release_all() returns, the caller may disconnect
+            self.head = 0
+            self.length = 0
+            self.unsent_count = 0
+            self.consumer_usage = 0
+            self.consumer_report[0] = 0
+            self.consumer_report[1] = 0
+            self._send(CONSUMER, self.consumer_report, False)
+            self._clear(self.nkro_report if self.nkro else self.report)
+            self._flush(True, False)
             for i in range(4):
                 self.mouse_report[i] = 0
-            self.mouse.send_report(self.mouse_report)
+            self._send(MOUSE, self.mouse_report, False)
         except Exception as e:
             print(e)
     @property
@@ -0,0 +1,74 @@
+'''matrix scan kernels compiled with @micropython.native, see kernels.py'''
+import micropython
+
+
+@micropython.native
+def changes(last, busy, r, bits):
+    '''
+    XOR a row sample against the last one, mark changed keys busy
+
+    Returns:
+        packed int of changed keys
+    '''
+    changed = bits ^ last[r]
+    if changed:
+        last[r] = bits
+        busy[r] = busy[r] | changed
+    return changed
+
+
+@micropython.native
+def stamp(debounce, base, changed, t):
+    '''Store time t for every changed key of the row starting at base'''
+    i = base
+    while changed:
+        if changed & 1:
+            debounce[i] = t
+        changed = changed >> 1
+        i += 1
+
+
+@micropython.native
+def expired(debounce, base, busy, t, window):
+    '''
+    Find busy keys whose last change is older than window [ms]
+
+    Returns:
+        packed int of those keys
+    '''
+    ready = 0
+    mask = 1
+    i = base
+    while busy:
+        if busy & 1:
+            # ticks_diff() > window for the 2**30 ticks period, masked
+            # differences from 2**29 up are negative ones
+            d = (t - debounce[i]) & 0x3FFFFFFF
+            if d < 0x20000000 and d > window:
+                ready |= mask
+        busy = busy >> 1
+        mask = mask << 1
+        i += 1
+    return ready
+
+
+@micropython.native
+def expired_keys(debounce, windows, base, busy, t):
+    '''
+    Like expired() with a window [ms] per key taken from windows
+
+    Returns:
+        packed int of those keys
+    '''
+    ready = 0
+    mask = 1
+    i = base
+    while busy:
+        if busy & 1:
+            d = (t - debounce[i]) & 0x3FFFFFFF
+            if d < 0x20000000 and d > windows[i]:
+                ready |= mask
+        busy = busy >> 1
+        mask = mask << 1
+        i += 1
+    return ready
@@ -0,0 +1,74 @@
+'''matrix scan kernels compiled with @micropython.viper, see kernels.py'''
+import micropython
+
+
+@micropython.viper
+def changes(last: ptr32, busy: ptr32, r: int, bits: int) -> int:
+    '''
+    XOR a row sample against the last one, mark changed keys busy
+
+    Returns:
+        packed int of changed keys
+    '''
+    changed = bits ^ last[r]
+    if changed:
+        last[r] = bits
+        busy[r] = busy[r] | changed
+    return changed
+
+
+@micropython.viper
+def stamp(debounce: ptr32, base: int, changed: int, t: int):
+    '''Store time t for every changed key of the row starting at base'''
+    i = base
+    while changed:
+        if changed & 1:
+            debounce[i] = t
+        changed = changed >> 1
+        i += 1
+
+
+@micropython.viper
+def expired(debounce: ptr32, base: int, busy: int, t: int, window: int) -> int:
+    '''
+    Find busy keys whose last change is older than window [ms]
+
+    Returns:
+        packed int of those keys
+    '''
+    ready = 0
+    mask = 1
+    i = base
+    while busy:
+        if busy & 1:
+            # ticks_diff() > window for the 2**30 ticks period, masked
+            # differences from 2**29 up are negative ones
+            d = (t - debounce[i]) & 0x3FFFFFFF
+            if d < 0x20000000 and d > window:
+                ready |= mask
+        busy = busy >> 1
+        mask = mask << 1
+        i += 1
+    return ready
+
+
+@micropython.viper
+def expired_keys(debounce: ptr32, windows: ptr8, base: int, busy: int, t: int) -> int:
+    '''
+    Like expired() with a window [ms] per key taken from windows
+
+    Returns:
+        packed int of those keys
+    '''
+    ready = 0
+    mask = 1
+    i = base
+    while busy:
+        if busy & 1:
+            d = (t - debounce[i]) & 0x3FFFFFFF
+            if d < 0x20000000 and d > windows[i]:
+                ready |= mask
+        busy = busy >> 1
+        mask = mask << 1
+        i += 1
+    return ready
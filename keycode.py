@@ -24,13 +24,15 @@
 
 # Other Keys(01xx)
 # ----------------
-# ACT_USAGE(0100): TODO: Not needed?
+# ACT_USAGE(0100):
 # 0100 | 00 | usage(10)     System control(0x80) - General Desktop page(0x01)
 # 0100 | 01 | usage(10)     Consumer control(0x01) - Consumer page(0x0C)
 
-# ACT_LAYER_TAP(100x):
-# 1llr | mods | keycode     Modifiers with Tap Key(Dual role)
-#   l: layer 00-default, 01-upper, 10-lower, 11-function
+# ACT_LAYER_TAP(101x):
+# 101x | layer | keycode    Layer on hold, key on tap(Dual role)
+#   x|layer: layer 0-31
+#
+# Same format as action_code.py, run by actions.Actions
 ##
 
 KC_NO = 0x00
@@ -260,35 +262,36 @@ KC_RGUI = 0xE7
 # QMK uses these for Mouse Keys - see below.
 
 # Media and Function keys
+# ACT_USAGE codes, usage ids of the HID usage tables
 # Generic Desktop Page(0x01)
-KC_SYSTEM_POWER = 0xA5
-KC_SYSTEM_SLEEP = 0xA6
-KC_SYSTEM_WAKE = 0xA7
+KC_SYSTEM_POWER = 0x4000 | 0x081
+KC_SYSTEM_SLEEP = 0x4000 | 0x082
+KC_SYSTEM_WAKE = 0x4000 | 0x083
 
 # Consumer Page(0x0C)
-KC_AUDIO_MUTE = 0x0D
-KC_AUDIO_VOL_UP = 0x0E
-KC_AUDIO_VOL_DOWN = 0x0F
-KC_MEDIA_NEXT_TRACK = 0x10
-KC_MEDIA_PREV_TRACK = 0x11
-KC_MEDIA_STOP = 0x12
-KC_MEDIA_PLAY_PAUSE = 0x13
-KC_MEDIA_SELECT = 0x14
-KC_MEDIA_EJECT = 0xB0
-KC_MAIL = 0xB1
-KC_CALCULATOR = 0xB2
-KC_MY_COMPUTER = 0xB3
-KC_WWW_SEARCH = 0xB4
-KC_WWW_HOME = 0xB5
-KC_WWW_BACK = 0xB6
-KC_WWW_FORWARD = 0xB7
-KC_WWW_STOP = 0xB8
-KC_WWW_REFRESH = 0xB9
-KC_WWW_FAVORITES = 0xBA
-KC_MEDIA_FAST_FORWARD = 0xBB
-KC_MEDIA_REWIND = 0xBC
-KC_BRIGHTNESS_UP = 0xBD
-KC_BRIGHTNESS_DOWN = 0xBE
+KC_AUDIO_MUTE = 0x4400 | 0x0E2
+KC_AUDIO_VOL_UP = 0x4400 | 0x0E9
+KC_AUDIO_VOL_DOWN = 0x4400 | 0x0EA
+KC_MEDIA_NEXT_TRACK = 0x4400 | 0x0B5
+KC_MEDIA_PREV_TRACK = 0x4400 | 0x0B6
+KC_MEDIA_STOP = 0x4400 | 0x0B7
+KC_MEDIA_PLAY_PAUSE = 0x4400 | 0x0CD
+KC_MEDIA_SELECT = 0x4400 | 0x183
+KC_MEDIA_EJECT = 0x4400 | 0x0B8
+KC_MAIL = 0x4400 | 0x18A
+KC_CALCULATOR = 0x4400 | 0x192
+KC_MY_COMPUTER = 0x4400 | 0x194
+KC_WWW_SEARCH = 0x4400 | 0x221
+KC_WWW_HOME = 0x4400 | 0x223
+KC_WWW_BACK = 0x4400 | 0x224
+KC_WWW_FORWARD = 0x4400 | 0x225
+KC_WWW_STOP = 0x4400 | 0x226
+KC_WWW_REFRESH = 0x4400 | 0x227
+KC_WWW_FAVORITES = 0x4400 | 0x22A
+KC_MEDIA_FAST_FORWARD = 0x4400 | 0x0B3
+KC_MEDIA_REWIND = 0x4400 | 0x0B4
+KC_BRIGHTNESS_UP = 0x4400 | 0x06F
+KC_BRIGHTNESS_DOWN = 0x4400 | 0x070
 
 # Fn keys
 KC_FN0 = 0xC0
@@ -451,31 +454,31 @@ def IS_ANY(code): return (KC_A <= (code) and (code) <= 0xFF)
 def IS_KEY(code): return (KC_A <= (code) and (code) <= KC_EXSEL)
 def IS_MOD(code): return (KC_LCTRL <= (code) and (code) <= KC_RGUI)
 def IS_SPECIAL(code): return (0xA5 <= (code) and (code) <= 0xDF) or (0xE8 <= (code) and (code) <= 0xFF)
-def IS_SYSTEM(code): return (KC_PWR <= (code) and (code) <= KC_WAKE)
-def IS_CONSUMER(code): return (KC_MUTE <= (code) and (code) <= KC_BRID)
+def IS_SYSTEM(code): return ((code) & 0xFC00) == 0x4000
+def IS_CONSUMER(code): return ((code) & 0xFC00) == 0x4400
 def IS_FN(code): return (KC_FN0 <= (code) and (code) <= KC_FN31)
 
 
 def layer(code):
-    if code & 0x8000:
-        return (code & 0x6000) >> 13
+    if code >> 13 == 0b101:  # ACT_LAYER_TAP(_EXT)
+        return (code >> 8) & 0x1F
     else:
         return 0
 
 
 def tap(code):
-    return code & 0x1FFF
+    return code & 0xFF
 
 
 def hold(code):
-    if code & 0x2000:
-        return code & 0x1FFF
+    if code >> 13 == 0b001:  # ACT_MODS_TAP
+        return (code >> 8) & 0x1F
     else:
-        layer(code)
+        return layer(code)
 
 
 def LT(layer, key):
-    return 0x8000 | (layer << 13) | key
+    return 0xA000 | (layer << 8) | key
 
 
 def MT(mkey, key):
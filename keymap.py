@@ -0,0 +1,74 @@
+'''
+compiled keymaps
+
+A keymap blob made by keymap_compiler.py is a flat table of 16 bit
+action codes, little endian:
+    b'MK', version u8, flags u8, layers u16, keys u16
+    layers * keys action codes
+Kept as a bytes object in a frozen module the table stays in flash.
+'''
+from array import array
+import struct
+
+MAGIC = b'MK'
+VERSION = 1
+HEADER = 8
+RESOLVED = 0x01  # transparent codes resolved ahead of time
+TRANSPARENT = 0x01
+
+
+class Layer:
+    '''
+    One layer read straight from the blob, no copy in RAM
+    '''
+
+    def __init__(self, blob, offset, keys):
+        self.blob = blob
+        self.offset = offset
+        self.keys = keys
+
+    def __len__(self):
+        return self.keys
+
+    def __getitem__(self, index):
+        i = self.offset + 2 * index
+        return self.blob[i] | (self.blob[i + 1] << 8)
+
+
+class Keymap:
+    '''
+    Action codes of a compiled keymap blob
+    '''
+
+    def __init__(self, blob):
+        magic, version, self.flags, self.layers, self.keys = struct.unpack_from('<2sBBHH', blob)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a keymap blob')
+        if len(blob) != HEADER + 2 * self.layers * self.keys:
+            raise ValueError('truncated keymap blob')
+        self.blob = blob
+
+    def get(self, layer, index):
+        i = HEADER + 2 * (layer * self.keys + index)
+        return self.blob[i] | (self.blob[i + 1] << 8)
+
+    def load(self, copy=False):
+        '''
+        Returns:
+            tuple of layers, array('H') copies in RAM when copy is set,
+            views of the blob otherwise
+        '''
+        size = 2 * self.keys
+        offsets = range(HEADER, HEADER + size * self.layers, size)
+        if copy:
+            return tuple(array('H', self.blob[i:i + size]) for i in offsets)
+        return tuple(Layer(self.blob, i, self.keys) for i in offsets)
+
+
+# layers of action codes for actions.Actions
+try:
+    from keymap_bin import KEYMAP
+    actionmap = Keymap(KEYMAP).load()
+except ImportError:
+    # not compiled, use the definitions in keys.py
+    from keys import KEYS_MAP as actionmap
@@ -0,0 +1,143 @@
+'''
+compile keymaps to a flat binary action table, runs on the host
+
+    python keymap_compiler.py [module:ATTR] [--tmk] [-o keymap_bin.py]
+    python keymap_compiler.py [module] --layout [-o layout_bin.py]
+
+Default input is keys:KEYS_MAP. The output module holds the blob as
+KEYMAP = b'...', freeze it into the firmware or copy it next to
+main.py; keymap.py loads it instead of keys.py. See keymap.py for the
+blob layout.
+
+--tmk reads action_code.py key names (main_v1.py layouts) instead of
+ints. Layers stack like TMK layer_state in actions.Actions, so a
+transparent code is resolved ahead of time only when every layer down
+to layer 0 is transparent too.
+
+--layout compiles a whole main_v1.py layout module, layout by default:
+keymap and profiles become blobs, pairs and macros are copied. main_v1.py
+loads layout_bin.py instead of layout.py, so the firmware does not load
+action_code.py and keycode names at all.
+'''
+import struct
+import sys
+from importlib import import_module
+
+from keymap import MAGIC, VERSION, RESOLVED, TRANSPARENT
+
+
+def resolve(layers, stack=False):
+    '''
+    Resolve transparent codes of a list of layers of ints in place
+    '''
+    # check the layers below as written, not as already resolved
+    source = [tuple(layer) for layer in layers]
+    for n in range(1, len(layers)):
+        for i, code in enumerate(source[n]):
+            if code != TRANSPARENT:
+                continue
+            if stack and any(source[m][i] != TRANSPARENT for m in range(1, n)):
+                continue
+            layers[n][i] = layers[0][i]
+
+
+def compile_layers(layers, convert=int, stack=False):
+    '''
+    Args:
+        layers: sequence of layers, each a sequence of key definitions
+        convert: maps a key definition to its 16 bit action code
+        stack: layers stack like TMK layer_mask instead of one active layer
+
+    Returns:
+        keymap blob
+    '''
+    codes = [[convert(k) for k in layer] for layer in layers]
+    keys = len(codes[0])
+    if any(len(layer) != keys for layer in codes):
+        raise ValueError('layers differ in length')
+    resolve(codes, stack)
+    blob = bytearray(struct.pack('<2sBBHH', MAGIC, VERSION, RESOLVED, len(codes), keys))
+    for layer in codes:
+        for code in layer:
+            blob += struct.pack('<H', code)
+    return bytes(blob)
+
+
+def blob_lines(blob, indent='    '):
+    '''Lines of blob as bytes literals of 16 bytes'''
+    return [indent + repr(blob[i:i + 16]) for i in range(0, len(blob), 16)]
+
+
+def module_source(blob, name='KEYMAP'):
+    '''Python source holding blob as a bytes literal'''
+    lines = ['# generated by keymap_compiler.py, do not edit', name + ' = (']
+    lines += blob_lines(blob)
+    lines.append(')')
+    return '\n'.join(lines) + '\n'
+
+
+def layout_source(layout):
+    '''
+    Python source of a main_v1.py layout module, keymap and profiles
+    compiled to blobs, macro parts from macros.py as bytes
+    '''
+    from action_code import get_action_code
+    lines = ['# generated by keymap_compiler.py from {}, do not edit'.format(layout.__name__)]
+    lines.append('keymap = (')
+    lines += blob_lines(compile_layers(layout.keymap, get_action_code, stack=True))
+    lines.append(')')
+    lines.append('profiles = {')
+    for name, layers in layout.profiles.items():
+        lines.append('    {!r}: ('.format(name))
+        lines += blob_lines(compile_layers(layers, get_action_code, stack=True), ' ' * 8)
+        lines.append('    ),')
+    lines.append('}')
+    lines.append('pairs = {!r}'.format(layout.pairs))
+    macros = []
+    for m in layout.macros:
+        # text stays str, main_v1 types it for the host layout
+        if isinstance(m, tuple):
+            macros.append(tuple(p if isinstance(p, str) else bytes(p) for p in m))
+        else:
+            macros.append(m if isinstance(m, str) else bytes(m))
+    lines.append('macros = {!r}'.format(tuple(macros)))
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv):
+    source = None
+    output = None
+    tmk = False
+    layout = False
+    args = iter(argv)
+    for arg in args:
+        if arg == '-o':
+            output = next(args)
+        elif arg == '--tmk':
+            tmk = True
+        elif arg == '--layout':
+            layout = True
+        else:
+            source = arg
+    if layout:
+        module = import_module(source or 'layout')
+        output = output or 'layout_bin.py'
+        with open(output, 'w') as f:
+            f.write(layout_source(module))
+        print('{}: keymap and {} profiles'.format(output, len(module.profiles)))
+        return
+    output = output or 'keymap_bin.py'
+    module, attr = (source or 'keys:KEYS_MAP').split(':')
+    layers = getattr(import_module(module), attr)
+    convert = int
+    if tmk:
+        from action_code import get_action_code
+        convert = get_action_code
+    blob = compile_layers(layers, convert, stack=True)
+    with open(output, 'w') as f:
+        f.write(module_source(blob))
+    print('{}: {} layers, {} bytes'.format(output, struct.unpack_from('<H', blob, 4)[0], len(blob)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,537 @@
+'''
+key name <-> code lookup, generated by gen_tables.py, do not edit
+
+Tables are bytes, frozen they stay in flash. Lookups are meant for the
+rare runtime uses like key names in logs, not for the key path.
+'''
+# names sorted, joined by newline
+NAMES = (
+    b'A\nAGAIN\nALT\nAPOS'
+    b'TROPHE\nAPPCONTRO'
+    b'L_BACK\nAPPCONTRO'
+    b'L_BOOKMARKS\nAPPC'
+    b'ONTROL_FORWARD\nA'
+    b'PPCONTROL_HOME\nA'
+    b'PPCONTROL_MINIMI'
+    b'ZE\nAPPCONTROL_RE'
+    b'FRESH\nAPPCONTROL'
+    b'_SEARCH\nAPPCONTR'
+    b'OL_STOP\nAPPLAUNC'
+    b'H_CALCULATOR\nAPP'
+    b'LAUNCH_CC_CONFIG'
+    b'\nAPPLAUNCH_EMAIL'
+    b'\nAPPLAUNCH_LOCAL'
+    b'_BROWSER\nAPPLAUN'
+    b'CH_LOCK\nAPPLICAT'
+    b'ION\nAUDIO_MUTE\nA'
+    b'UDIO_VOL_DOWN\nAU'
+    b'DIO_VOL_UP\nB\nBAC'
+    b'KSLASH\nBACKSPACE'
+    b'\nBOOTLOADER\nBT0\n'
+    b'BT1\nBT2\nBT3\nBT4\n'
+    b'BT5\nBT6\nBT7\nBT8\n'
+    b'BT9\nBT_OFF\nBT_ON'
+    b'\nBT_TOGGLE\nC\nCAP'
+    b'S\nCAPSLOCK\nCOMMA'
+    b'\nCOPY\nCTRL\nCUT\nD'
+    b'\nDEL\nDELETE\nDISP'
+    b'LAY_BRIGHTNESS_D'
+    b'OWN\nDISPLAY_BRIG'
+    b'HTNESS_UP\nDOT\nDO'
+    b'WN\nE\nEND\nENTER\nE'
+    b'QUAL\nESC\nESCAPE\n'
+    b'F\nF1\nF10\nF11\nF12'
+    b'\nF13\nF14\nF15\nF16'
+    b'\nF17\nF18\nF19\nF2\n'
+    b'F20\nF21\nF22\nF23\n'
+    b'F24\nF3\nF4\nF5\nF6\n'
+    b'F7\nF8\nF9\nFIND\nG\n'
+    b'GRAVE\nGUI\nH\nHANG'
+    b'EUL\nHANJA\nHASHTI'
+    b'LDE\nHEATMAP\nHELP'
+    b'\nHENKAN\nHIRAGANA'
+    b'\nHOME\nHUE_RGB\nI\n'
+    b'INSERT\nINT1\nINT2'
+    b'\nINT3\nINT4\nINT5\n'
+    b'INT6\nINT7\nINT8\nI'
+    b'NT9\nJ\nK\nKATAKANA'
+    b'\nKATAKANAHIRAGAN'
+    b'A\nKC_0\nKC_1\nKC_2'
+    b'\nKC_3\nKC_4\nKC_5\n'
+    b'KC_6\nKC_7\nKC_8\nK'
+    b'C_9\nKC_A\nKC_AGAI'
+    b'N\nKC_AGIN\nKC_ALG'
+    b'R\nKC_ALT_ERASE\nK'
+    b'C_APP\nKC_APPLICA'
+    b'TION\nKC_AUDIO_MU'
+    b'TE\nKC_AUDIO_VOL_'
+    b'DOWN\nKC_AUDIO_VO'
+    b'L_UP\nKC_B\nKC_BRI'
+    b'D\nKC_BRIGHTNESS_'
+    b'DOWN\nKC_BRIGHTNE'
+    b'SS_UP\nKC_BRIU\nKC'
+    b'_BRK\nKC_BRMD\nKC_'
+    b'BRMU\nKC_BSLASH\nK'
+    b'C_BSLS\nKC_BSPACE'
+    b'\nKC_BSPC\nKC_C\nKC'
+    b'_CALC\nKC_CALCULA'
+    b'TOR\nKC_CANCEL\nKC'
+    b'_CAPS\nKC_CAPSLOC'
+    b'K\nKC_CLCK\nKC_CLE'
+    b'AR\nKC_CLEAR_AGAI'
+    b'N\nKC_CLR\nKC_COMM'
+    b'\nKC_COMMA\nKC_COP'
+    b'Y\nKC_CRSEL\nKC_CU'
+    b'RRENCY_SUB_UNIT\n'
+    b'KC_CURRENCY_UNIT'
+    b'\nKC_CUT\nKC_D\nKC_'
+    b'DECIMAL_SEPARATO'
+    b'R\nKC_DEL\nKC_DELE'
+    b'TE\nKC_DOT\nKC_DOW'
+    b'N\nKC_E\nKC_EJCT\nK'
+    b'C_END\nKC_ENT\nKC_'
+    b'ENTER\nKC_EQL\nKC_'
+    b'EQUAL\nKC_ERAS\nKC'
+    b'_ESC\nKC_ESCAPE\nK'
+    b'C_EXEC\nKC_EXECUT'
+    b'E\nKC_EXLM\nKC_EXS'
+    b'EL\nKC_F\nKC_F1\nKC'
+    b'_F10\nKC_F11\nKC_F'
+    b'12\nKC_F13\nKC_F14'
+    b'\nKC_F15\nKC_F16\nK'
+    b'C_F17\nKC_F18\nKC_'
+    b'F19\nKC_F2\nKC_F20'
+    b'\nKC_F21\nKC_F22\nK'
+    b'C_F23\nKC_F24\nKC_'
+    b'F3\nKC_F4\nKC_F5\nK'
+    b'C_F6\nKC_F7\nKC_F8'
+    b'\nKC_F9\nKC_FIND\nK'
+    b'C_FN0\nKC_FN1\nKC_'
+    b'FN10\nKC_FN11\nKC_'
+    b'FN12\nKC_FN13\nKC_'
+    b'FN14\nKC_FN15\nKC_'
+    b'FN16\nKC_FN17\nKC_'
+    b'FN18\nKC_FN19\nKC_'
+    b'FN2\nKC_FN20\nKC_F'
+    b'N21\nKC_FN22\nKC_F'
+    b'N23\nKC_FN24\nKC_F'
+    b'N25\nKC_FN26\nKC_F'
+    b'N27\nKC_FN28\nKC_F'
+    b'N29\nKC_FN3\nKC_FN'
+    b'30\nKC_FN31\nKC_FN'
+    b'4\nKC_FN5\nKC_FN6\n'
+    b'KC_FN7\nKC_FN8\nKC'
+    b'_FN9\nKC_G\nKC_GRA'
+    b'VE\nKC_GRV\nKC_H\nK'
+    b'C_HAEN\nKC_HANJ\nK'
+    b'C_HELP\nKC_HENK\nK'
+    b'C_HOME\nKC_I\nKC_I'
+    b'NS\nKC_INSERT\nKC_'
+    b'INT1\nKC_INT2\nKC_'
+    b'INT3\nKC_INT4\nKC_'
+    b'INT5\nKC_INT6\nKC_'
+    b'INT7\nKC_INT8\nKC_'
+    b'INT9\nKC_J\nKC_JYE'
+    b'N\nKC_K\nKC_KANA\nK'
+    b'C_KP_0\nKC_KP_00\n'
+    b'KC_KP_000\nKC_KP_'
+    b'1\nKC_KP_2\nKC_KP_'
+    b'3\nKC_KP_4\nKC_KP_'
+    b'5\nKC_KP_6\nKC_KP_'
+    b'7\nKC_KP_8\nKC_KP_'
+    b'9\nKC_KP_A\nKC_KP_'
+    b'AND\nKC_KP_ASTERI'
+    b'SK\nKC_KP_ATMARK\n'
+    b'KC_KP_B\nKC_KP_BI'
+    b'NARY\nKC_KP_BSPAC'
+    b'E\nKC_KP_C\nKC_KP_'
+    b'CLEAR\nKC_KP_CLEA'
+    b'R_ENTRY\nKC_KP_CO'
+    b'LON\nKC_KP_COMMA\n'
+    b'KC_KP_D\nKC_KP_DE'
+    b'CIMAL\nKC_KP_DOT\n'
+    b'KC_KP_E\nKC_KP_EN'
+    b'TER\nKC_KP_EQUAL\n'
+    b'KC_KP_EQUAL_AS40'
+    b'0\nKC_KP_EXCLAMAT'
+    b'ION\nKC_KP_F\nKC_K'
+    b'P_GT\nKC_KP_HASH\n'
+    b'KC_KP_HAT\nKC_KP_'
+    b'HEXADECIMAL\nKC_K'
+    b'P_LAZYAND\nKC_KP_'
+    b'LAZYOR\nKC_KP_LCB'
+    b'RACKET\nKC_KP_LPA'
+    b'REN\nKC_KP_LT\nKC_'
+    b'KP_MEM_ADD\nKC_KP'
+    b'_MEM_CLEAR\nKC_KP'
+    b'_MEM_DIV\nKC_KP_M'
+    b'EM_MUL\nKC_KP_MEM'
+    b'_RECALL\nKC_KP_ME'
+    b'M_STORE\nKC_KP_ME'
+    b'M_SUB\nKC_KP_MINU'
+    b'S\nKC_KP_OCTAL\nKC'
+    b'_KP_OR\nKC_KP_PER'
+    b'C\nKC_KP_PLUS\nKC_'
+    b'KP_PLUS_MINUS\nKC'
+    b'_KP_RCBRACKET\nKC'
+    b'_KP_RPAREN\nKC_KP'
+    b'_SLASH\nKC_KP_SPA'
+    b'CE\nKC_KP_TAB\nKC_'
+    b'KP_XOR\nKC_L\nKC_L'
+    b'ALT\nKC_LANG1\nKC_'
+    b'LANG2\nKC_LANG3\nK'
+    b'C_LANG4\nKC_LANG5'
+    b'\nKC_LANG6\nKC_LAN'
+    b'G7\nKC_LANG8\nKC_L'
+    b'ANG9\nKC_LBRACKET'
+    b'\nKC_LBRC\nKC_LCAP'
+    b'\nKC_LCMD\nKC_LCTL'
+    b'\nKC_LCTRL\nKC_LEF'
+    b'T\nKC_LGUI\nKC_LNU'
+    b'M\nKC_LOCKING_CAP'
+    b'S\nKC_LOCKING_NUM'
+    b'\nKC_LOCKING_SCRO'
+    b'LL\nKC_LOPT\nKC_LS'
+    b'CR\nKC_LSFT\nKC_LS'
+    b'HIFT\nKC_LWIN\nKC_'
+    b'M\nKC_MAIL\nKC_MED'
+    b'IA_EJECT\nKC_MEDI'
+    b'A_FAST_FORWARD\nK'
+    b'C_MEDIA_NEXT_TRA'
+    b'CK\nKC_MEDIA_PLAY'
+    b'_PAUSE\nKC_MEDIA_'
+    b'PREV_TRACK\nKC_ME'
+    b'DIA_REWIND\nKC_ME'
+    b'DIA_SELECT\nKC_ME'
+    b'DIA_STOP\nKC_MENU'
+    b'\nKC_MFFD\nKC_MHEN'
+    b'\nKC_MINS\nKC_MINU'
+    b'S\nKC_MNXT\nKC_MPL'
+    b'Y\nKC_MPRV\nKC_MRW'
+    b'D\nKC_MSEL\nKC_MST'
+    b'P\nKC_MUTE\nKC_MYC'
+    b'M\nKC_MY_COMPUTER'
+    b'\nKC_N\nKC_NLCK\nKC'
+    b'_NO\nKC_NONUS_BSL'
+    b'ASH\nKC_NONUS_HAS'
+    b'H\nKC_NUBS\nKC_NUH'
+    b'S\nKC_NUMLOCK\nKC_'
+    b'O\nKC_OPER\nKC_OUT'
+    b'\nKC_P\nKC_P0\nKC_P'
+    b'1\nKC_P2\nKC_P3\nKC'
+    b'_P4\nKC_P5\nKC_P6\n'
+    b'KC_P7\nKC_P8\nKC_P'
+    b'9\nKC_PAST\nKC_PAS'
+    b'TE\nKC_PAUS\nKC_PA'
+    b'USE\nKC_PCMM\nKC_P'
+    b'DOT\nKC_PENT\nKC_P'
+    b'EQL\nKC_PGDN\nKC_P'
+    b'GDOWN\nKC_PGUP\nKC'
+    b'_PMNS\nKC_POST_FA'
+    b'IL\nKC_POWER\nKC_P'
+    b'PLS\nKC_PRIOR\nKC_'
+    b'PSCR\nKC_PSCREEN\n'
+    b'KC_PSLS\nKC_PSTE\n'
+    b'KC_PWR\nKC_Q\nKC_Q'
+    b'UOT\nKC_QUOTE\nKC_'
+    b'R\nKC_RALT\nKC_RBR'
+    b'ACKET\nKC_RBRC\nKC'
+    b'_RCMD\nKC_RCTL\nKC'
+    b'_RCTRL\nKC_RETURN'
+    b'\nKC_RGHT\nKC_RGUI'
+    b'\nKC_RIGHT\nKC_RO\n'
+    b'KC_ROLL_OVER\nKC_'
+    b'ROPT\nKC_RSFT\nKC_'
+    b'RSHIFT\nKC_RWIN\nK'
+    b'C_S\nKC_SCLN\nKC_S'
+    b'COLON\nKC_SCROLLL'
+    b'OCK\nKC_SELECT\nKC'
+    b'_SEPARATOR\nKC_SL'
+    b'ASH\nKC_SLCK\nKC_S'
+    b'LCT\nKC_SLEP\nKC_S'
+    b'LSH\nKC_SPACE\nKC_'
+    b'SPC\nKC_STOP\nKC_S'
+    b'YSREQ\nKC_SYSTEM_'
+    b'POWER\nKC_SYSTEM_'
+    b'SLEEP\nKC_SYSTEM_'
+    b'WAKE\nKC_T\nKC_TAB'
+    b'\nKC_THOUSANDS_SE'
+    b'PARATOR\nKC_TRANS'
+    b'PARENT\nKC_TRNS\nK'
+    b'C_U\nKC_UNDEFINED'
+    b'\nKC_UNDO\nKC_UP\nK'
+    b'C_V\nKC_VOLD\nKC_V'
+    b'OLU\nKC_W\nKC_WAKE'
+    b'\nKC_WBAK\nKC_WFAV'
+    b'\nKC_WFWD\nKC_WHOM'
+    b'\nKC_WREF\nKC_WSCH'
+    b'\nKC_WSTP\nKC_WWW_'
+    b'BACK\nKC_WWW_FAVO'
+    b'RITES\nKC_WWW_FOR'
+    b'WARD\nKC_WWW_HOME'
+    b'\nKC_WWW_REFRESH\n'
+    b'KC_WWW_SEARCH\nKC'
+    b'_WWW_STOP\nKC_X\nK'
+    b'C_Y\nKC_Z\nKC_ZKHK'
+    b'\nKC__MUTE\nKC__VO'
+    b'LDOWN\nKC__VOLUP\n'
+    b'KP0\nKP1\nKP2\nKP3\n'
+    b'KP4\nKP5\nKP6\nKP7\n'
+    b'KP8\nKP9\nKPASTERI'
+    b'SK\nKPCOMMA\nKPDOT'
+    b'\nKPENTER\nKPEQUAL'
+    b'\nKPJPCOMMA\nKPLEF'
+    b'TPAREN\nKPMINUS\nK'
+    b'PPLUS\nKPRIGHTPAR'
+    b'EN\nKPSLASH\nL\nLAL'
+    b'T\nLANG1\nLANG2\nLA'
+    b'NG3\nLANG4\nLANG5\n'
+    b'LANG6\nLANG7\nLANG'
+    b'8\nLANG9\nLCTRL\nLE'
+    b'FT\nLEFTBRACE\nLEF'
+    b'T_ALT\nLEFT_CTRL\n'
+    b'LEFT_GUI\nLEFT_SH'
+    b'IFT\nLGUI\nLSHIFT\n'
+    b'M\nMENU\nMINUS\nMOD'
+    b'_RGB\nMS_BTN1\nMS_'
+    b'BTN2\nMS_BTN3\nMS_'
+    b'BTN4\nMS_BTN5\nMS_'
+    b'DL\nMS_DN\nMS_DR\nM'
+    b'S_LT\nMS_RT\nMS_UL'
+    b'\nMS_UP\nMS_UR\nMS_'
+    b'W_DN\nMS_W_UP\nMUH'
+    b'ENKAN\nMUTE\nN\nNO\n'
+    b'NUMLOCK\nO\nOPEN\nP'
+    b'\nPAGEDOWN\nPAGEUP'
+    b'\nPASTE\nPAUSE\nPGD'
+    b'N\nPGUP\nPOWER\nPRI'
+    b'NTSCREEN\nPRTSCN\n'
+    b'Q\nQUOTE\nR\nRALT\nR'
+    b'CTRL\nRGB_HUE\nRGB'
+    b'_MOD\nRGB_SAT\nRGB'
+    b'_TOGGLE\nRGB_VAL\n'
+    b'RGUI\nRIGHT\nRIGHT'
+    b'BRACE\nRIGHT_ALT\n'
+    b'RIGHT_CTRL\nRIGHT'
+    b'_GUI\nRIGHT_SHIFT'
+    b'\nRO\nRSHIFT\nS\nSAT'
+    b'_RGB\nSCROLLLOCK\n'
+    b'SELECT\nSEMICOLON'
+    b'\nSHIFT\nSHUTDOWN\n'
+    b'SLASH\nSPACE\nSTOP'
+    b'\nSUSPEND\nT\nTAB\nT'
+    b'RANSPARENT\nTRANS'
+    b'PORT_EJECT\nTRANS'
+    b'PORT_FAST_FORWAR'
+    b'D\nTRANSPORT_NEXT'
+    b'_TRACK\nTRANSPORT'
+    b'_PLAY_PAUSE\nTRAN'
+    b'SPORT_PREV_TRACK'
+    b'\nTRANSPORT_RECOR'
+    b'D\nTRANSPORT_REWI'
+    b'ND\nTRANSPORT_STO'
+    b'P\nTRANSPORT_STOP'
+    b'_EJECT\nU\nUNDO\nUP'
+    b'\nUSB_TOGGLE\nV\nVA'
+    b'L_RGB\nW\nX\nY\nYEN\n'
+    b'Z\nZENKAKUHANKAKU'
+)
+# u16 offset of every name in NAMES, little endian
+OFFSETS = (
+    b"\x00\x00\x02\x00\x08\x00\x0c\x00\x17\x00'\x00<\x00O\x00"
+    b'_\x00s\x00\x86\x00\x98\x00\xa8\x00\xbd\x00\xd1\x00\xe1\x00'
+    b'\xf9\x00\x08\x01\x14\x01\x1f\x01.\x01;\x01=\x01G\x01'
+    b'Q\x01\\\x01`\x01d\x01h\x01l\x01p\x01t\x01'
+    b'x\x01|\x01\x80\x01\x84\x01\x8b\x01\x91\x01\x9b\x01\x9d\x01'
+    b'\xa2\x01\xab\x01\xb1\x01\xb6\x01\xbb\x01\xbf\x01\xc1\x01\xc5\x01'
+    b'\xcc\x01\xe4\x01\xfa\x01\xfe\x01\x03\x02\x05\x02\t\x02\x0f\x02'
+    b'\x15\x02\x19\x02 \x02"\x02%\x02)\x02-\x021\x02'
+    b'5\x029\x02=\x02A\x02E\x02I\x02M\x02P\x02'
+    b'T\x02X\x02\\\x02`\x02d\x02g\x02j\x02m\x02'
+    b'p\x02s\x02v\x02y\x02~\x02\x80\x02\x86\x02\x8a\x02'
+    b'\x8c\x02\x94\x02\x9a\x02\xa4\x02\xac\x02\xb1\x02\xb8\x02\xc1\x02'
+    b'\xc6\x02\xce\x02\xd0\x02\xd7\x02\xdc\x02\xe1\x02\xe6\x02\xeb\x02'
+    b'\xf0\x02\xf5\x02\xfa\x02\xff\x02\x04\x03\x06\x03\x08\x03\x11\x03'
+    b'"\x03\'\x03,\x031\x036\x03;\x03@\x03E\x03'
+    b'J\x03O\x03T\x03Y\x03b\x03j\x03r\x03\x7f\x03'
+    b'\x86\x03\x95\x03\xa3\x03\xb5\x03\xc5\x03\xca\x03\xd2\x03\xe5\x03'
+    b"\xf6\x03\xfe\x03\x05\x04\r\x04\x15\x04\x1f\x04'\x041\x04"
+    b'9\x04>\x04F\x04T\x04^\x04f\x04r\x04z\x04'
+    b'\x83\x04\x92\x04\x99\x04\xa1\x04\xaa\x04\xb2\x04\xbb\x04\xd0\x04'
+    b'\xe1\x04\xe8\x04\xed\x04\x02\x05\t\x05\x13\x05\x1a\x05"\x05'
+    b"'\x05/\x056\x05=\x05F\x05M\x05V\x05^\x05"
+    b'e\x05o\x05w\x05\x82\x05\x8a\x05\x93\x05\x98\x05\x9e\x05'
+    b'\xa5\x05\xac\x05\xb3\x05\xba\x05\xc1\x05\xc8\x05\xcf\x05\xd6\x05'
+    b'\xdd\x05\xe4\x05\xea\x05\xf1\x05\xf8\x05\xff\x05\x06\x06\r\x06'
+    b'\x13\x06\x19\x06\x1f\x06%\x06+\x061\x067\x06?\x06'
+    b'F\x06M\x06U\x06]\x06e\x06m\x06u\x06}\x06'
+    b'\x85\x06\x8d\x06\x95\x06\x9d\x06\xa4\x06\xac\x06\xb4\x06\xbc\x06'
+    b'\xc4\x06\xcc\x06\xd4\x06\xdc\x06\xe4\x06\xec\x06\xf4\x06\xfb\x06'
+    b"\x03\x07\x0b\x07\x12\x07\x19\x07 \x07'\x07.\x075\x07"
+    b':\x07C\x07J\x07O\x07W\x07_\x07g\x07o\x07'
+    b'w\x07|\x07\x83\x07\x8d\x07\x95\x07\x9d\x07\xa5\x07\xad\x07'
+    b'\xb5\x07\xbd\x07\xc5\x07\xcd\x07\xd5\x07\xda\x07\xe2\x07\xe7\x07'
+    b'\xef\x07\xf7\x07\x00\x08\n\x08\x12\x08\x1a\x08"\x08*\x08'
+    b'2\x08:\x08B\x08J\x08R\x08Z\x08d\x08s\x08'
+    b'\x80\x08\x88\x08\x95\x08\xa2\x08\xaa\x08\xb6\x08\xc8\x08\xd4\x08'
+    b'\xe0\x08\xe8\x08\xf6\x08\x00\t\x08\t\x14\t \t2\t'
+    b'D\tL\tU\t`\tj\t|\t\x8a\t\x97\t'
+    b'\xa7\t\xb4\t\xbd\t\xcb\t\xdb\t\xe9\t\xf7\t\x08\n'
+    b'\x18\n&\n2\n>\nG\nR\n]\nn\n'
+    b'~\n\x8b\n\x97\n\xa3\n\xad\n\xb7\n\xbc\n\xc4\n'
+    b'\xcd\n\xd6\n\xdf\n\xe8\n\xf1\n\xfa\n\x03\x0b\x0c\x0b'
+    b'\x15\x0b!\x0b)\x0b1\x0b9\x0bA\x0bJ\x0bR\x0b'
+    b'Z\x0bb\x0br\x0b\x81\x0b\x93\x0b\x9b\x0b\xa3\x0b\xab\x0b'
+    b'\xb5\x0b\xbd\x0b\xc2\x0b\xca\x0b\xd9\x0b\xef\x0b\x03\x0c\x17\x0c'
+    b'+\x0c;\x0cK\x0cY\x0ca\x0ci\x0cq\x0cy\x0c'
+    b'\x82\x0c\x8a\x0c\x92\x0c\x9a\x0c\xa2\x0c\xaa\x0c\xb2\x0c\xba\x0c'
+    b'\xc2\x0c\xd1\x0c\xd6\x0c\xde\x0c\xe4\x0c\xf4\x0c\x02\r\n\r'
+    b'\x12\r\x1d\r"\r*\r1\r6\r<\rB\r'
+    b'H\rN\rT\rZ\r`\rf\rl\rr\r'
+    b'z\r\x83\r\x8b\r\x94\r\x9c\r\xa4\r\xac\r\xb4\r'
+    b'\xbc\r\xc6\r\xce\r\xd6\r\xe3\r\xec\r\xf4\r\xfd\r'
+    b"\x05\x0e\x10\x0e\x18\x0e \x0e'\x0e,\x0e4\x0e=\x0e"
+    b'B\x0eJ\x0eV\x0e^\x0ef\x0en\x0ew\x0e\x81\x0e'
+    b'\x89\x0e\x91\x0e\x9a\x0e\xa0\x0e\xad\x0e\xb5\x0e\xbd\x0e\xc7\x0e'
+    b'\xcf\x0e\xd4\x0e\xdc\x0e\xe6\x0e\xf4\x0e\xfe\x0e\x0b\x0f\x14\x0f'
+    b'\x1c\x0f$\x0f,\x0f4\x0f=\x0fD\x0fL\x0fV\x0f'
+    b'f\x0fv\x0f\x85\x0f\x8a\x0f\x91\x0f\xa8\x0f\xb7\x0f\xbf\x0f'
+    b'\xc4\x0f\xd1\x0f\xd9\x0f\xdf\x0f\xe4\x0f\xec\x0f\xf4\x0f\xf9\x0f'
+    b'\x01\x10\t\x10\x11\x10\x19\x10!\x10)\x101\x109\x10'
+    b'E\x10V\x10e\x10q\x10\x80\x10\x8e\x10\x9a\x10\x9f\x10'
+    b'\xa4\x10\xa9\x10\xb1\x10\xba\x10\xc6\x10\xd0\x10\xd4\x10\xd8\x10'
+    b'\xdc\x10\xe0\x10\xe4\x10\xe8\x10\xec\x10\xf0\x10\xf4\x10\xf8\x10'
+    b'\x03\x11\x0b\x11\x11\x11\x19\x11!\x11+\x117\x11?\x11'
+    b'F\x11S\x11[\x11]\x11b\x11h\x11n\x11t\x11'
+    b'z\x11\x80\x11\x86\x11\x8c\x11\x92\x11\x98\x11\x9e\x11\xa3\x11'
+    b'\xad\x11\xb6\x11\xc0\x11\xc9\x11\xd4\x11\xd9\x11\xe0\x11\xe2\x11'
+    b'\xe7\x11\xed\x11\xf5\x11\xfd\x11\x05\x12\r\x12\x15\x12\x1d\x12'
+    b'#\x12)\x12/\x125\x12;\x12A\x12G\x12M\x12'
+    b'U\x12]\x12f\x12k\x12m\x12p\x12x\x12z\x12'
+    b'\x7f\x12\x81\x12\x8a\x12\x91\x12\x97\x12\x9d\x12\xa2\x12\xa7\x12'
+    b'\xad\x12\xb9\x12\xc0\x12\xc2\x12\xc8\x12\xca\x12\xcf\x12\xd5\x12'
+    b'\xdd\x12\xe5\x12\xed\x12\xf8\x12\x00\x13\x05\x13\x0b\x13\x16\x13'
+    b' \x13+\x135\x13A\x13D\x13K\x13M\x13U\x13'
+    b'`\x13g\x13q\x13w\x13\x80\x13\x86\x13\x8c\x13\x91\x13'
+    b'\x99\x13\x9b\x13\x9f\x13\xab\x13\xbb\x13\xd2\x13\xe7\x13\xfc\x13'
+    b'\x11\x14"\x143\x14B\x14W\x14Y\x14^\x14a\x14'
+    b'l\x14n\x14v\x14x\x14z\x14|\x14\x80\x14\x82\x14'
+)
+# u16 code of every name, little endian
+CODES = (
+    b'\x04\x00y\x00\xe2\x004\x00$F*F%F#F'
+    b"\x06F'F!F&F\x92E\x83E\x8aE\x94E"
+    b'\x9eEe\x00\xe2D\xeaD\xe9D\x05\x001\x00*\x00'
+    b'\x00\xe0\x00\xe1\x01\xe1\x02\xe1\x03\xe1\x04\xe1\x05\xe1\x06\xe1'
+    b'\x07\xe1\x08\xe1\t\xe1\xfd\xe1\xfe\xe1\xff\xe1\x06\x009\x00'
+    b'9\x006\x00|\x00\xe0\x00{\x00\x07\x00L\x00L\x00'
+    b'pDoD7\x00Q\x00\x08\x00M\x00(\x00.\x00'
+    b')\x00)\x00\t\x00:\x00C\x00D\x00E\x00h\x00'
+    b'i\x00j\x00k\x00l\x00m\x00n\x00;\x00o\x00'
+    b'p\x00q\x00r\x00s\x00<\x00=\x00>\x00?\x00'
+    b'@\x00A\x00B\x00~\x00\n\x005\x00\xe3\x00\x0b\x00'
+    b'\x90\x00\x91\x002\x00\x01\xe0u\x00\x8a\x00\x93\x00J\x00'
+    b'\x04\xd0\x0c\x00I\x00\x87\x00\x88\x00\x89\x00\x8a\x00\x8b\x00'
+    b'\x8c\x00\x8d\x00\x8e\x00\x8f\x00\r\x00\x0e\x00\x92\x00\x88\x00'
+    b'\'\x00\x1e\x00\x1f\x00 \x00!\x00"\x00#\x00$\x00'
+    b'%\x00&\x00\x04\x00y\x00y\x00\xe6\x00\x99\x00e\x00'
+    b'e\x00\xe2D\xeaD\xe9D\x05\x00pDpDoD'
+    b'oDH\x00G\x00H\x001\x001\x00*\x00*\x00'
+    b'\x06\x00\x92E\x92E\x9b\x009\x009\x009\x00\x9c\x00'
+    b'\xa2\x00\x9c\x006\x006\x00|\x00\xa3\x00\xb5\x00\xb4\x00'
+    b'{\x00\x07\x00\xb3\x00L\x00L\x007\x00Q\x00\x08\x00'
+    b'\xb8DM\x00(\x00(\x00.\x00.\x00\x99\x00)\x00'
+    b')\x00t\x00t\x00\xcf\x00\xa4\x00\t\x00:\x00C\x00'
+    b'D\x00E\x00h\x00i\x00j\x00k\x00l\x00m\x00'
+    b'n\x00;\x00o\x00p\x00q\x00r\x00s\x00<\x00'
+    b'=\x00>\x00?\x00@\x00A\x00B\x00~\x00\xc0\x00'
+    b'\xc1\x00\xca\x00\xcb\x00\xcc\x00\xcd\x00\xce\x00\xcf\x00\xd0\x00'
+    b'\xd1\x00\xd2\x00\xd3\x00\xc2\x00\xd4\x00\xd5\x00\xd6\x00\xd7\x00'
+    b'\xd8\x00\xd9\x00\xda\x00\xdb\x00\xdc\x00\xdd\x00\xc3\x00\xde\x00'
+    b'\xdf\x00\xc4\x00\xc5\x00\xc6\x00\xc7\x00\xc8\x00\xc9\x00\n\x00'
+    b'5\x005\x00\x0b\x00\x90\x00\x91\x00u\x00\x8a\x00J\x00'
+    b'\x0c\x00I\x00I\x00\x87\x00\x88\x00\x89\x00\x8a\x00\x8b\x00'
+    b'\x8c\x00\x8d\x00\x8e\x00\x8f\x00\r\x00\x89\x00\x0e\x00\x88\x00'
+    b'b\x00\xb0\x00\xb1\x00Y\x00Z\x00[\x00\\\x00]\x00'
+    b'^\x00_\x00`\x00a\x00\xbc\x00\xc7\x00U\x00\xce\x00'
+    b'\xbd\x00\xda\x00\xbb\x00\xbe\x00\xd8\x00\xd9\x00\xcb\x00\x85\x00'
+    b'\xbf\x00\xdc\x00c\x00\xc0\x00X\x00g\x00\x86\x00\xcf\x00'
+    b'\xc1\x00\xc6\x00\xcc\x00\xc3\x00\xdd\x00\xc8\x00\xca\x00\xb8\x00'
+    b'\xb6\x00\xc5\x00\xd3\x00\xd2\x00\xd6\x00\xd5\x00\xd1\x00\xd0\x00'
+    b'\xd4\x00V\x00\xdb\x00\xc9\x00\xc4\x00W\x00\xd7\x00\xb9\x00'
+    b'\xb7\x00T\x00\xcd\x00\xba\x00\xc2\x00\x0f\x00\xe2\x00\x90\x00'
+    b'\x91\x00\x92\x00\x93\x00\x94\x00\x95\x00\x96\x00\x97\x00\x98\x00'
+    b'/\x00/\x00\x82\x00\xe3\x00\xe0\x00\xe0\x00P\x00\xe3\x00'
+    b'\x83\x00\x82\x00\x83\x00\x84\x00\xe2\x00\x84\x00\xe1\x00\xe1\x00'
+    b'\xe3\x00\x10\x00\x8aE\xb8D\xb3D\xb5D\xcdD\xb6D'
+    b'\xb4D\x83E\xb7Dv\x00\xb3D\x8b\x00-\x00-\x00'
+    b'\xb5D\xcdD\xb6D\xb4D\x83E\xb7D\xe2D\x94E'
+    b'\x94E\x11\x00S\x00\x00\x00d\x002\x00d\x002\x00'
+    b'S\x00\x12\x00\xa1\x00\xa0\x00\x13\x00b\x00Y\x00Z\x00'
+    b'[\x00\\\x00]\x00^\x00_\x00`\x00a\x00U\x00'
+    b'}\x00H\x00H\x00\x85\x00c\x00X\x00g\x00N\x00'
+    b'N\x00K\x00V\x00\x02\x00f\x00W\x00\x9d\x00F\x00'
+    b'F\x00T\x00}\x00\x81@\x14\x004\x004\x00\x15\x00'
+    b'\xe6\x000\x000\x00\xe7\x00\xe4\x00\xe4\x00\x9e\x00O\x00'
+    b'\xe7\x00O\x00\x87\x00\x01\x00\xe6\x00\xe5\x00\xe5\x00\xe7\x00'
+    b'\x16\x003\x003\x00G\x00w\x00\x9f\x008\x00G\x00'
+    b'w\x00\x82@8\x00,\x00,\x00x\x00\x9a\x00\x81@'
+    b'\x82@\x83@\x17\x00+\x00\xb2\x00\x01\x00\x01\x00\x18\x00'
+    b'\x03\x00z\x00R\x00\x19\x00\xeaD\xe9D\x1a\x00\x83@'
+    b"$F*F%F#F'F!F&F$F"
+    b"*F%F#F'F!F&F\x1b\x00\x1c\x00"
+    b'\x1d\x005\x00\x7f\x00\x81\x00\x80\x00b\x00Y\x00Z\x00'
+    b'[\x00\\\x00]\x00^\x00_\x00`\x00a\x00U\x00'
+    b'\x85\x00c\x00X\x00g\x00\x8c\x00\xb6\x00V\x00W\x00'
+    b'\xb7\x00T\x00\x0f\x00\xe2\x00\x90\x00\x91\x00\x92\x00\x93\x00'
+    b'\x94\x00\x95\x00\x96\x00\x97\x00\x98\x00\xe0\x00P\x00/\x00'
+    b'\xe2\x00\xe0\x00\xe3\x00\xe1\x00\xe3\x00\xe1\x00\x10\x00e\x00'
+    b'-\x00\x02\xd0\x01P\x02P\x04P\x08P\x10P\x00W'
+    b'\x00R\x00X\x00S\x00T\x00U\x00Q\x00V\x00Z'
+    b'\x00Y\x8b\x00\x7f\x00\x11\x00\x00\x00S\x00\x12\x00t\x00'
+    b'\x13\x00N\x00K\x00}\x00H\x00N\x00K\x00f\x00'
+    b'F\x00F\x00\x14\x004\x00\x15\x00\xe6\x00\xe4\x00\x03\xd0'
+    b'\x01\xd0\x05\xd0\x00\xd0\x07\xd0\xe7\x00O\x000\x00\xe6\x00'
+    b'\xe4\x00\xe7\x00\xe5\x00\x87\x00\xe5\x00\x16\x00\x06\xd0G\x00'
+    b'w\x003\x00\xe1\x00\x03\xe08\x00,\x00x\x00\x02\xe0'
+    b'\x17\x00+\x00\x01\x00\xb8D\xb3D\xb5D\xcdD\xb6D'
+    b'\xb2D\xb4D\xb7D\xccD\x18\x00z\x00R\x00\x04\xe0'
+    b'\x19\x00\x08\xd0\x1a\x00\x1b\x00\x1c\x00\x89\x00\x1d\x00\x94\x00'
+)
+COUNT = 624
+
+
+def _name(i):
+    start = OFFSETS[2 * i] | (OFFSETS[2 * i + 1] << 8)
+    end = NAMES.find(b'\n', start)
+    return NAMES[start:end if end >= 0 else len(NAMES)]
+
+
+def code(name):
+    '''
+    Returns:
+        code of key or action name, None when unknown
+    '''
+    target = name.encode()
+    lo = 0
+    hi = COUNT
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _name(mid) < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < COUNT and _name(lo) == target:
+        return CODES[2 * lo] | (CODES[2 * lo + 1] << 8)
+    return None
+
+
+def name(code):
+    '''
+    Returns:
+        first name of code in alphabetic order, hex code when unknown
+    '''
+    for i in range(COUNT):
+        if CODES[2 * i] | (CODES[2 * i + 1] << 8) == code:
+            return _name(i).decode()
+    return hex(code)
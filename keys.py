@@ -1,4 +1,15 @@
-from keycode import *
+from keycode import (
+    KC_NO, KC_A, KC_B, KC_C, KC_D, KC_E, KC_F, KC_G, KC_H, KC_I, KC_J, KC_K,
+    KC_L, KC_M, KC_N, KC_O, KC_P, KC_Q, KC_R, KC_S, KC_T, KC_U, KC_V, KC_W,
+    KC_X, KC_Y, KC_Z, KC_1, KC_2, KC_3, KC_4, KC_5, KC_6, KC_7, KC_8, KC_9,
+    KC_0, KC_ENTER, KC_BSPACE, KC_TAB, KC_SPACE, KC_MINUS, KC_EQUAL,
+    KC_NONUS_HASH, KC_COMMA, KC_DOT, KC_SLASH, KC_F1, KC_F2, KC_F3, KC_F4,
+    KC_F5, KC_F6, KC_F7, KC_F8, KC_F9, KC_F10, KC_F11, KC_F12, KC_HOME,
+    KC_PGUP, KC_END, KC_RIGHT, KC_LEFT, KC_DOWN, KC_UP, KC_POWER, KC_F13,
+    KC_LCTRL, KC_LSHIFT, KC_LALT, KC_LGUI, KC_TRANSPARENT, KC_ESC, KC_LBRC,
+    KC_RBRC, KC_BSLS, KC_SCLN, KC_QUOT, KC_PGDN, KC_MUTE, KC_VOLU, KC_VOLD,
+    KC_MNXT, KC_MPRV, KC_MPLY, KC_BRIU, KC_BRID, LT, MT, S,
+)
 
 KC____ = KC_TRANSPARENT
 KM_ESC = MT(KC_LGUI, KC_ESC)
@@ -8,8 +19,8 @@ KM_SPACE = MT(KC_LALT, KC_SPACE)
 KM_PLUS = S(KC_EQUAL)
 KM_UNDR = S(KC_MINUS)
 KM_PIPE = S(KC_BSLS)
-KM_VUP = KC__VOLUP
-KM_VDN = KC__VOLDOWN
+KM_VUP = KC_VOLU
+KM_VDN = KC_VOLD
 UPPER = LT(1, KC_BSPACE)
 LOWER = LT(2, KC_TAB)
 # fmt: off
@@ -0,0 +1,78 @@
+'''
+host keyboard layouts for sendtext.py, generated by gen_tables.py, do not edit
+
+A layout is (codes, extra, altgr, dead):
+    codes   bytes, keycode | 0x80 with shift, of ASCII character c at
+            codes[c] and of character extra[i] at codes[128 + i], 0 when
+            the layout cannot type it
+    extra   str of the non ASCII characters
+    altgr   bytes, bit i & 7 of byte i >> 3 set when code i needs AltGr
+    dead    bytes, same bits for dead keys, typed as the key then space
+'''
+US = (
+    b'\x00\x01\x00\x00\x00\x00\x00\x00*+(\x00\x00(\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00)\x00\x00\x00\x00'
+    b',\x9e\xb4\xa0\xa1\xa2\xa44\xa6\xa7\xa5\xae6-78'
+    b'\'\x1e\x1f !"#$%&\xb33\xb6.\xb7\xb8'
+    b'\x9f\x84\x85\x86\x87\x88\x89\x8a\x8b\x8c\x8d\x8e\x8f\x90\x91\x92'
+    b'\x93\x94\x95\x96\x97\x98\x99\x9a\x9b\x9c\x9d/10\xa3\xad'
+    b'5\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\x11\x12'
+    b'\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\xaf\xb1\xb0\xb5L',
+    '',
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00',
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00',
+)
+DE = (
+    b'\x00\x01\x00\x00\x00\x00\x00\x00*+(\x00\x00(\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00)\x00\x00\x00\x00'
+    b',\x9e\x9f2\xa1\xa2\xa3\xb2\xa5\xa6\xb00687\xa4'
+    b'\'\x1e\x1f !"#$%&\xb7\xb6d\xa7\xe4\xad'
+    b'\x14\x84\x85\x86\x87\x88\x89\x8a\x8b\x8c\x8d\x8e\x8f\x90\x91\x92'
+    b'\x93\x94\x95\x96\x97\x98\x99\x9a\x9b\x9d\x9c%-&5\xb8'
+    b'\xae\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\x11\x12'
+    b"\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1d\x1c$d'0L"
+    b'\xa0\xb5\x1f .\x10\xb4\xb3\xaf-43/\x08',
+    '§°²³´µÄÖÜßäöü€',
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x008\x00\x00\x00x'
+    b', ',
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00@\x01\x00\x00\x00'
+    b'\x10\x00',
+)
+FR = (
+    b'\x00\x01\x00\x00\x00\x00\x00\x00*+(\x00\x00(\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00)\x00\x00\x00\x00'
+    b',8  0\xb4\x1e!"-2\xae\x10#\xb6\xb7'
+    b'\xa7\x9e\x9f\xa0\xa1\xa2\xa3\xa4\xa5\xa676d.\xe4\x90'
+    b"'\x94\x85\x86\x87\x88\x89\x8a\x8b\x8c\x8d\x8e\x8f\xb3\x91\x92"
+    b'\x93\x84\x95\x96\x97\x98\x99\x9d\x9b\x9c\x9a"%-&%'
+    b'$\x14\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f3\x11\x12'
+    b'\x13\x04\x15\x16\x17\x18\x19\x1d\x1b\x1c\x1a!#.\x1fL'
+    b"\xb00\xb8\xaf\xad5\xb2'&$\x1f4\x08",
+    '£¤§¨°²µàçèéù€',
+    b'\x00\x00\x00\x00\x08\x00\x00\x00\x01\x00\x00x\x01\x00\x00x'
+    b'\x02\x10',
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00@'
+    b'\x08\x00',
+)
+UK = (
+    b'\x00\x01\x00\x00\x00\x00\x00\x00*+(\x00\x00(\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00)\x00\x00\x00\x00'
+    b',\x9e\x9f2\xa1\xa2\xa44\xa6\xa7\xa5\xae6-78'
+    b'\'\x1e\x1f !"#$%&\xb33\xb6.\xb7\xb8'
+    b'\xb4\x84\x85\x86\x87\x88\x89\x8a\x8b\x8c\x8d\x8e\x8f\x90\x91\x92'
+    b'\x93\x94\x95\x96\x97\x98\x99\x9a\x9b\x9c\x9d/d0\xa3\xad'
+    b'5\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\x11\x12'
+    b'\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\xaf\xe4\xb0\xb2L'
+    b'\xa0\xb5!',
+    '£¬€',
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x04',
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00',
+)
+LAYOUTS = {
+    'us': US,
+    'de': DE,
+    'fr': FR,
+    'uk': UK,
+}
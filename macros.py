@@ -0,0 +1,220 @@
+'''
+macros played in the background of the main loop
+
+A macro is bytes of steps, report steps as sendtext.encode makes them
+and two more:
+    units, DELAY                wait units * 10 ms
+    0, CONSUMER, usage(u16)     send consumer usage, 0 releases
+Build them once with macro() from text, tap(), delay() and consumer().
+
+run() is a generator running one macro: it sends a step and yields the
+ms to wait, None for one report interval. Player drives it from a timer,
+so the main loop keeps scanning and handling keys while a long macro
+types. Closing the generator releases whatever the macro holds.
+'''
+from time import sleep_ms
+
+from layouts import US
+from sendtext import encode, stroke, DEAD, RELEASE, KEEP, MOD_KEYCODE
+
+DELAY = 0x02
+CONSUMER = 0x03
+# action kinds, as in action_code.py
+ACT_MODS_RIGHT = 0b0001
+ACT_USAGE = 0b0100
+USAGE_CONSUMER = 0x400
+
+
+def delay(ms):
+    '''Steps waiting ms, in 10 ms units'''
+    steps = bytearray()
+    units = (ms + 9) // 10
+    while units > 0:
+        steps.append(min(units, 255))
+        steps.append(DELAY)
+        units -= 255
+    return steps
+
+
+def consumer(usage):
+    '''Steps pressing and releasing consumer usage'''
+    return bytes((0, CONSUMER, usage & 0xFF, usage >> 8, 0, CONSUMER, 0, 0))
+
+
+def tap(*keys, layout=US):
+    '''
+    Steps pressing keys together, modifiers first, then releasing
+
+    keys are keycodes, names and action codes as in keymaps: modified
+    keys (ACT_MODS) and one consumer usage. A character is the key and
+    modifiers that type it on layout.
+    '''
+    from action_code import get_action_code  # layouts only, not at boot
+    mods = 0
+    usage = 0
+    keycodes = bytearray()
+    for key in keys:
+        if isinstance(key, str) and len(key) == 1:
+            code = stroke(layout, key)
+            if not code or code & DEAD:
+                raise ValueError('{!r} is not a key on this layout'.format(key))
+            mods |= code >> 8
+            keycodes.append(code & 0xFF)
+            continue
+        code = get_action_code(key)
+        kind = code >> 12
+        if MOD_KEYCODE <= code < MOD_KEYCODE + 8:
+            mods |= 1 << (code - MOD_KEYCODE)
+        elif kind <= ACT_MODS_RIGHT and code > 3 and code & 0xFF < MOD_KEYCODE:
+            # 000r | mods(4) | keycode, r for the right modifiers
+            bits = (code >> 8) & 0xF
+            mods |= bits << 4 if kind else bits
+            if code & 0xFF:
+                keycodes.append(code & 0xFF)
+        elif kind == ACT_USAGE and code & USAGE_CONSUMER and not usage:
+            usage = code & 0x3FF
+        else:
+            raise ValueError('{} cannot be tapped in a macro'.format(key))
+    steps = bytearray()
+    if mods:
+        steps.append(mods)
+        steps.append(KEEP)
+    for keycode in keycodes:
+        steps.append(mods)
+        steps.append(keycode)
+    if usage:
+        steps.extend(consumer(usage))
+    if mods or keycodes:
+        steps.append(0)
+        steps.append(RELEASE)
+    return steps
+
+
+def macro(*parts, layout=US):
+    '''
+    Returns:
+        bytes of the steps of parts, text for str parts, steps from
+        delay(), consumer() and tap() as they are
+    '''
+    steps = bytearray()
+    for part in parts:
+        if isinstance(part, str):
+            part = encode(part, layout)
+        steps.extend(part)
+    return bytes(steps)
+
+
+def run(steps, output):
+    '''
+    Send steps to output, press_keys, release_keys and send_consumer as
+    in actions.py, begin() and end() around every report step
+
+    Yields:
+        ms to wait after a step, None for one report interval
+    '''
+    keys = []
+    mods = 0
+    usage = 0
+    i = 0
+    try:
+        while i < len(steps):
+            arg = steps[i]
+            op = steps[i + 1]
+            i += 2
+            if op == DELAY:
+                yield arg * 10
+                continue
+            output.begin()
+            if op == CONSUMER:
+                usage = steps[i] | (steps[i + 1] << 8)
+                i += 2
+                output.send_consumer(usage)
+            else:
+                if op == RELEASE:
+                    for keycode in keys:
+                        output.release_keys((), keycode)
+                    keys.clear()
+                changed = mods ^ arg
+                for bit in range(8):
+                    if (changed >> bit) & 1:
+                        if (arg >> bit) & 1:
+                            output.press_keys((), MOD_KEYCODE + bit)
+                        else:
+                            output.release_keys((), MOD_KEYCODE + bit)
+                mods = arg
+                if op > KEEP:
+                    output.press_keys((), op)
+                    keys.append(op)
+            output.end()
+            yield None
+    finally:
+        # done or cancelled, leave nothing pressed
+        if keys or mods or usage:
+            output.begin()
+            for keycode in keys:
+                output.release_keys((), keycode)
+            for bit in range(8):
+                if (mods >> bit) & 1:
+                    output.release_keys((), MOD_KEYCODE + bit)
+            if usage:
+                output.send_consumer(0)
+            output.end()
+
+
+def play(steps, output):
+    '''Send steps right away, waiting only for DELAY steps'''
+    for ms in run(steps, output):
+        if ms:
+            sleep_ms(ms)
+
+
+class Player:
+    '''
+    Play macros one after the other from a timers.Timers timer, one
+    report step every 1000 / rate ms
+    '''
+
+    def __init__(self, output, timers, rate=100):
+        self.output = output
+        self.timers = timers
+        self.timer = timers.add(self.step)
+        self.interval = 10
+        self.set_rate(rate)
+        self.queue = []  # macros waiting
+        self.current = None  # run() generator of the playing macro
+
+    def set_rate(self, rate):
+        '''Send rate reports per second, the host may take less'''
+        self.interval = max(1000 // rate, 1)
+
+    @property
+    def active(self):
+        return self.current is not None or len(self.queue) > 0
+
+    def play(self, steps):
+        '''Play steps after the macros before them'''
+        self.queue.append(steps)
+        if self.current is None:
+            self.timers.start(self.timer, 0)
+
+    def cancel(self):
+        '''Stop the playing macro and drop the waiting ones'''
+        self.queue.clear()
+        self.timers.cancel(self.timer)
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+
+    def step(self):
+        while True:
+            if self.current is None:
+                if not self.queue:
+                    return
+                self.current = run(self.queue.pop(0), self.output)
+            try:
+                ms = next(self.current)
+            except StopIteration:
+                self.current = None
+                continue
+            self.timers.start(self.timer, self.interval if ms is None else ms)
+            return
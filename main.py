@@ -3,10 +3,15 @@ MMK
 '''
 from syst import Syst
 from rotary_irq_esp import RotaryIRQ
-from time import ticks_ms, ticks_add, ticks_diff
+from time import ticks_ms, sleep_ms
 from display import Disp
 from battery import battery_level
 from matrix import Matrix
+from actions import Actions
+from hid import HID, report_devices
+from keymap import actionmap
+from governor import Governor
+from timers import Timers
 from machine import reset_cause, DEEPSLEEP_RESET
 
 # check if the device woke from a deep sleep
@@ -14,6 +19,12 @@ if reset_cause() == DEEPSLEEP_RESET:
     print('woke up from a deep sleep')
 
 matrix = Matrix()
+# no USB or BLE HID yet, keeps the last reports; NKRO stays off until a
+# transport tells HID.set_boot_protocol() what the host asked for
+hid = HID(report_devices())
+timers = Timers()
+actions = Actions(matrix, hid, actionmap, timers=timers)
+governor = Governor()
 display = Disp()
 s = Syst()
 
@@ -27,27 +38,46 @@ r = RotaryIRQ(pin_num_clk=17,
               pull_up=True,
               range_mode=RotaryIRQ.RANGE_BOUNDED)
 
-tBattery = 0
-tEncoder = 0
-tKeyboard = 0
-tDisplay = ticks_add(ticks_ms(), 5000)
-display.logo()
-while True:
+
+def update_battery():
+    display.battery(battery_level())
+
+
+def update_encoder():
+    display.brightness(r.value())
+
+
+def scan():
     t = ticks_ms()
-    if ticks_diff(t, tBattery) > 0:
-        display.battery(battery_level())
-        tBattery = ticks_add(t, 500)
-    if ticks_diff(t, tEncoder) > 0:
-        display.brightness(r.value())
-        tEncoder = ticks_add(t, 10)
-    if ticks_diff(t, tKeyboard) > 0:
-        matrix.scan()
-        if matrix.decode() > 0:
-            display.poweron()
-            tDisplay = ticks_add(ticks_ms(), 5000)
-        tKeyboard = ticks_add(t, 1)
-    if ticks_diff(t, tDisplay) > 0:
-        display.poweroff()
-        s.sleep()
+    period = governor.update(matrix.scan(), t)
+    if actions.poll() > 0:
         display.poweron()
-        tDisplay = ticks_add(ticks_ms(), 5000)
+        timers.start(display_timer, 5000, t)
+    timers.start(scan_timer, period, t)
+
+
+def sleep():
+    display.poweroff()
+    s.sleep()
+    matrix.wake()  # sleep() reconfigured rows and columns
+    display.poweron()
+    timers.start(display_timer, 5000, ticks_ms())
+
+
+battery_timer = timers.add(update_battery, 500)
+encoder_timer = timers.add(update_encoder, 10)
+scan_timer = timers.add(scan)
+display_timer = timers.add(sleep)
+timers.start(battery_timer, 0)
+timers.start(encoder_timer, 0)
+timers.start(scan_timer, 0)
+timers.start(display_timer, 5000)
+display.logo()
+while True:
+    # sleep until the next timer, machine.idle() only yields on the ESP32
+    # and would spin; a column IRQ of the idle matrix sets matrix.woken,
+    # which scans right after the sleep
+    if matrix.woken:
+        timers.start(scan_timer, 0, ticks_ms())
+    timers.poll(ticks_ms())
+    sleep_ms(timers.timeout(ticks_ms()))
@@ -1,8 +1,16 @@
 '''keyboard matrix'''
-from time import ticks_ms
-from machine import Pin
-from keycode import layer
-from keys import key
+from array import array
+from time import ticks_ms, ticks_add, ticks_diff, sleep_ms
+from backends import DirectBackend
+# a port without the emitter raises ImportError or SyntaxError, code the
+# emitter cannot compile ViperTypeError or others, all fall back
+try:
+    from kernels_viper import changes, stamp, expired, expired_keys
+except Exception:
+    try:
+        from kernels_native import changes, stamp, expired, expired_keys
+    except Exception:
+        from kernels import changes, stamp, expired, expired_keys
 
 
 class Matrix:
@@ -12,25 +20,55 @@ class Matrix:
 
     ROWS = (5, 18, 23, 19)
     COLS = (13, 15, 2, 34, 4, 25, 26, 27, 14, 12)  # 2,0,4
+    QUEUE_SIZE = 32  # key events kept until get()
+    # debounce algorithms
+    DEBOUNCE_DEFER = 0  # wait until key is stable
+    DEBOUNCE_EAGER = 1  # report first edge, then lock key out
+    DEBOUNCE_DEFER_ROW = 2  # wait until whole row is stable
+    BOUNCE_BINS = 16  # 1 ms bins of bounce histogram, last one is 15+ ms
+    BOUNCE_SAMPLES = 8  # bursts needed before a key window is tuned
+    NO_BURST = 0xFFFFFFFF  # burst start of a key without edges, no ticks value
 
-    def __init__(self):
-        self.keys = len(self.ROWS) * len(self.COLS)
-        self.state = []  # list of currently pressed keys
-        self.rows = []  # row as output
-        for row in self.ROWS:
-            io = Pin(row, Pin.OUT)
-            io.value(0)
-            self.rows.append(io)
-        self.cols = []  # col as input
-        for col in self.COLS:
-            io = Pin(col, Pin.IN, Pin.PULL_DOWN)
-            self.cols.append(io)
-        # row selected value depends on diodes' direction
-        self.last = [0] * self.keys  # key last status
-        self.debounce = [0] * self.keys  # key hold state
-        self.matrix = [0] * self.keys  # key current state
+    def __init__(self, debounce_mode=DEBOUNCE_DEFER, backend=None):
+        if backend is None:
+            # row selected value depends on diodes' direction
+            backend = DirectBackend(self.ROWS, self.COLS)
+        self.backend = backend
+        self.read_row = backend.read_row  # packed columns of row
+        self.height = backend.rows
+        self.width = backend.cols
+        self.keys = self.height * self.width
+        if self.keys > 128:
+            raise ValueError('events hold 7 bit key indexes, {} keys'.format(self.keys))
+        if self.width > 32:
+            raise ValueError('rows are packed in 32 bit words, {} columns'.format(self.width))
+        self.last = array('L', [0] * self.height)  # last raw sample, one packed int per row
+        self.busy = array('L', [0] * self.height)  # keys that need a look, one packed int per row
         self._debounce_time = 10  # 10 ms
+        # time of key last change, one window back so no key boots locked out
+        start = ticks_add(ticks_ms(), -self._debounce_time - 1)
+        self.debounce = array('L', [start] * self.keys)
+        self.row_debounce = array('L', [0] * self.height)  # time of row last change
+        self.matrix = bytearray(self.keys)  # key current state
         self._hold_time = 200  # 500 ms
+        self.debounce_mode = debounce_mode
+        # per key bounce statistics, DEBOUNCE_DEFER only
+        self.bounce_stats = True
+        self.bounce = bytearray(self.keys * self.BOUNCE_BINS)  # saturating counts
+        self.burst = array('L', [self.NO_BURST] * self.keys)  # time of burst first edge
+        self.window = bytearray([self._debounce_time] * self.keys)  # tuned windows
+        self._auto_debounce = False
+        # ring buffer of key events: key index, bit 7 set on release
+        self.queue = bytearray(self.QUEUE_SIZE)
+        self.queue_time = array('L', [0] * self.QUEUE_SIZE)
+        self.head = 0  # oldest event
+        self.length = 0  # events in queue
+        self.keydown_time = array('L', [0] * self.keys)
+        self.keyup_time = array('L', [0] * self.keys)
+        self._idle_time = 1000  # quiet time before idle, None never idle
+        self._active = ticks_ms()  # time of last activity
+        self.idle = False  # rows are high and columns wait for an edge
+        self.woken = False  # set by column IRQ while idle
 
     def scan(self):
         '''
@@ -42,58 +80,329 @@ class Matrix:
         - tap       single press and release
         - hold      hold some time
 
-        Writes output to state[]:
+        Every row is sampled into one packed int and XORed against the
+        previous sample. Only keys whose bits flipped, are still bouncing,
+        wait for hold or have to clear a tap are visited one by one, so an
+        idle row costs a read, a XOR and a test.
+
+        Writes output to matrix[]:
         - 0 key is up (free)
         - 1 key is down (unknown, tap or hold)
         - 2 key is hold (longer than _hold_time)
         - 3 key was pressed
+
+        After idle_time without any key down or settling the matrix goes
+        idle: scan() returns at once until a column IRQ wakes it.
+
+        Returns:
+            True when a key is down or changing
         '''
+        if self.idle:
+            if not self.woken:
+                return False
+            self.wake()
         time_ms = ticks_ms()
-        key_index = -1
-        for row in self.rows:
-            row.value(1)  # select row
-            for col in self.cols:
-                key_index += 1
-                current = col.value()  # check column
-                if current != self.last[key_index]:
-                    self.debounce[key_index] = time_ms
-                self.last[key_index] = current
-                if (time_ms - self.debounce[key_index]) > self._debounce_time:
-                    if current == 0:
-                        if self.matrix[key_index] == 1:
-                            self.matrix[key_index] = 3
-                        else:
-                            self.matrix[key_index] = 0
-                    else:
-                        if (time_ms - self.debounce[key_index]) > self._hold_time:
-                            # hold detected
-                            self.matrix[key_index] = 2
-                        else:
-                            self.matrix[key_index] = 1
-            row.value(0)
-
-    def decode(self):
-        '''
-        Try to find what keys is pressed
-
-        Inputs:
-            matrix[] of scanned physical keys
+        active = False
+        base = 0
+        for r in range(self.height):
+            bits = self.read_row(r)
+            changed = changes(self.last, self.busy, r, bits)
+            busy = self.busy[r]
+            if busy:
+                busy = self.busy[r] = self._settle(r, base, bits, changed, busy, time_ms)
+            if bits or busy:
+                active = True
+            base += self.width
+        if active:
+            self._active = time_ms
+        elif self._idle_time is not None and ticks_diff(time_ms, self._active) > self._idle_time:
+            self.suspend()
+        return active
+
+    def suspend(self):
+        '''
+        Stop scanning until the backend sees an edge on any column
+        '''
+        self.woken = False
+        self.idle = True
+        if not self.backend.sleep(self._on_edge):
+            # backend cannot wake us, keep scanning
+            self.idle = False
+            self._active = ticks_ms()
+
+    def _on_edge(self, pin):
+        '''Column IRQ handler'''
+        self.woken = True
+
+    def wake(self):
+        '''
+        Leave idle mode and go back to scanning
+        '''
+        if self.idle:
+            self.backend.wake()
+        self.idle = False
+        self.woken = False
+        self._active = ticks_ms()
+
+    def _settle_defer(self, r, base, bits, changed, busy, time_ms):
+        '''
+        Defer per key: report a key after it was stable for _debounce_time
 
         Returns:
-            length of state[] list of pressed keys
-        '''
-        self.state = []
-        cur_layer = 0
-        for idx, val in enumerate(self.matrix):
-            if val == 2:
-                if layer(key(cur_layer, idx)):
-                    cur_layer = layer(key(cur_layer, idx))
-        # TODO modifiers
-        for idx, val in enumerate(self.matrix):
-            if val == 3:
-                self.state.append(key(cur_layer, idx) and 0x00FF)
-                print('key:{} idx:{} val:{}'.format(hex(key(cur_layer, idx)), idx, val))
-        return len(self.state)
+            packed int of keys still busy after this scan
+        '''
+        if changed:
+            if self.bounce_stats:
+                self._burst(base, changed, time_ms)
+            stamp(self.debounce, base, changed, time_ms)
+        if self._auto_debounce:
+            ready = expired_keys(self.debounce, self.window, base, busy, time_ms)
+        else:
+            ready = expired(self.debounce, base, busy, time_ms, self._debounce_time)
+        mask = 1
+        key_index = base
+        while mask <= ready:
+            if ready & mask:
+                if self._update(key_index, bits & mask, self.debounce[key_index], time_ms):
+                    busy &= ~mask
+            mask <<= 1
+            key_index += 1
+        return busy
+
+    def _burst(self, base, changed, time_ms):
+        '''
+        Track bounce bursts of the changed keys of one row
+
+        An edge after _debounce_time of silence starts a new burst and
+        records the previous one, from its first to its last edge. An
+        edge inside _debounce_time belongs to the running burst even when
+        a tuned window already reported the key: that is chatter, so the
+        key falls back to the full window until it is tuned again. The
+        first edge of a key only starts a burst.
+        '''
+        key_index = base
+        while changed:
+            if changed & 1:
+                last = self.debounce[key_index]
+                gap = ticks_diff(time_ms, last)
+                if gap > self._debounce_time:
+                    first = self.burst[key_index]
+                    if first != self.NO_BURST:
+                        self._record(key_index, ticks_diff(last, first))
+                    self.burst[key_index] = time_ms
+                elif gap > self.window[key_index]:
+                    self.window[key_index] = self._debounce_time
+            changed >>= 1
+            key_index += 1
+
+    def _record(self, key_index, duration):
+        '''Add a bounce duration [ms] to the key histogram'''
+        bins = self.BOUNCE_BINS
+        start = key_index * bins
+        i = start + min(max(duration, 0), bins - 1)
+        if self.bounce[i] == 255:
+            # age the whole histogram, old outliers fade out
+            for j in range(start, start + bins):
+                self.bounce[j] >>= 1
+        self.bounce[i] += 1
+        if self._auto_debounce:
+            self.tune(key_index)
+
+    def tune(self, key_index):
+        '''
+        Derive the key debounce window from its bounce histogram
+
+        The window covers the longest bounce seen plus 2 ms, never longer
+        than _debounce_time. Keys with too few bursts keep _debounce_time.
+        '''
+        bins = self.BOUNCE_BINS
+        start = key_index * bins
+        total = 0
+        longest = 0
+        for i in range(bins):
+            count = self.bounce[start + i]
+            if count:
+                total += count
+                longest = i
+        if total < self.BOUNCE_SAMPLES:
+            self.window[key_index] = self._debounce_time
+        else:
+            self.window[key_index] = min(longest + 2, self._debounce_time)
+
+    def bounce_histogram(self, key_index):
+        '''
+        Returns:
+            bytes of bounce counts per 1 ms bin
+        '''
+        start = key_index * self.BOUNCE_BINS
+        return bytes(self.bounce[start:start + self.BOUNCE_BINS])
+
+    def _settle_eager(self, r, base, bits, changed, busy, time_ms):
+        '''
+        Eager per key: report the first edge at once, then ignore the key
+        for _debounce_time. A change hidden by the lockout is reported
+        when the lockout ends.
+
+        Returns:
+            packed int of keys still busy after this scan
+        '''
+        mask = 1
+        key_index = base
+        while mask <= busy:
+            if busy & mask:
+                since = self.debounce[key_index]
+                locked = ticks_diff(time_ms, since) <= self._debounce_time
+                state = self.matrix[key_index]
+                if (state == 1 or state == 2) != bool(bits & mask):
+                    if not locked:
+                        # edge accepted, lockout starts now
+                        since = self.debounce[key_index] = time_ms
+                        locked = True
+                        self._update(key_index, bits & mask, since, time_ms)
+                elif self._update(key_index, bits & mask, since, time_ms) and not locked:
+                    busy &= ~mask
+            mask <<= 1
+            key_index += 1
+        return busy
+
+    def _settle_defer_row(self, r, base, bits, changed, busy, time_ms):
+        '''
+        Defer per row: report the keys of a row after the whole row was
+        stable for _debounce_time
+
+        Returns:
+            packed int of keys still busy after this scan
+        '''
+        if changed:
+            stamp(self.debounce, base, changed, time_ms)
+            self.row_debounce[r] = time_ms
+            return busy
+        if ticks_diff(time_ms, self.row_debounce[r]) <= self._debounce_time:
+            return busy
+        mask = 1
+        key_index = base
+        while mask <= busy:
+            if busy & mask:
+                if self._update(key_index, bits & mask, self.debounce[key_index], time_ms):
+                    busy &= ~mask
+            mask <<= 1
+            key_index += 1
+        return busy
+
+    def _update(self, key_index, pressed, since, time_ms):
+        '''
+        Apply a debounced sample to matrix[key_index]
+
+        A key whose event does not fit in the full queue keeps its old
+        state, so the event is retried on the next scan with its original
+        timestamp instead of being dropped.
+
+        Args:
+            pressed: key is down
+            since: time of the key last change
+
+        Returns:
+            True when the key needs no more attention
+        '''
+        state = self.matrix[key_index]
+        if pressed:
+            if state == 1 or state == 2 or self.put(key_index, since):
+                if ticks_diff(time_ms, since) > self._hold_time:
+                    # hold detected
+                    self._set(key_index, 2)
+                    return True
+                self._set(key_index, 1)
+            return False
+        if state == 1:
+            if self.put(key_index | 0x80, since):
+                self._set(key_index, 3)
+            return False
+        if state != 2 or self.put(key_index | 0x80, since):
+            self._set(key_index, 0)
+            return True
+        return False
+
+    def _set(self, key_index, state):
+        self.matrix[key_index] = state
+
+    def put(self, event, time_ms):
+        '''
+        Append key event to the queue
+
+        Returns:
+            False when the queue is full
+        '''
+        if self.length >= self.QUEUE_SIZE:
+            return False
+        i = (self.head + self.length) % self.QUEUE_SIZE
+        self.queue[i] = event
+        self.queue_time[i] = time_ms
+        self.length += 1
+        if event & 0x80:
+            self.keyup_time[event & 0x7F] = time_ms
+        else:
+            self.keydown_time[event] = time_ms
+        return True
+
+    def get(self):
+        '''
+        Remove and return the oldest key event
+        '''
+        if self.length == 0:
+            raise IndexError('empty queue')
+        event = self.queue[self.head]
+        self.head = (self.head + 1) % self.QUEUE_SIZE
+        self.length -= 1
+        return event
+
+    def view(self, n):
+        '''
+        Peek at event n of the queue, negative n looks at consumed events
+        '''
+        return self.queue[(self.head + n) % self.QUEUE_SIZE]
+
+    def view_time(self, n):
+        '''
+        Timestamp of event n of the queue
+        '''
+        return self.queue_time[(self.head + n) % self.QUEUE_SIZE]
+
+    def clear(self):
+        '''
+        Drop all queued events
+        '''
+        self.head = (self.head + self.length) % self.QUEUE_SIZE
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def wait(self, timeout=1000):
+        '''
+        Scan until an event is queued or timeout [ms] expires
+
+        Returns:
+            number of queued events
+        '''
+        end = ticks_add(ticks_ms(), timeout)
+        while True:
+            self.scan()
+            if self.length or ticks_diff(end, ticks_ms()) <= 0:
+                return self.length
+            sleep_ms(1)
+
+    def time(self):
+        return ticks_ms()
+
+    def ms(self, t):
+        '''Convert time() difference to milliseconds'''
+        return t
+
+    def get_keydown_time(self, key):
+        return self.keydown_time[key]
+
+    def get_keyup_time(self, key):
+        return self.keyup_time[key]
 
     @property
     def debounce_time(self):
@@ -103,6 +412,42 @@ class Matrix:
     def debounce_time(self, _t):
         """Set debounce time"""
         self._debounce_time = _t
+        for key_index in range(self.keys):
+            self.tune(key_index)
+
+    @property
+    def debounce_mode(self):
+        return self._debounce_mode
+
+    @debounce_mode.setter
+    def debounce_mode(self, mode):
+        """Select debounce algorithm, one of DEBOUNCE_*"""
+        self._settle = (
+            self._settle_defer,
+            self._settle_eager,
+            self._settle_defer_row,
+        )[mode]
+        self._debounce_mode = mode
+
+    @property
+    def auto_debounce(self):
+        return self._auto_debounce
+
+    @auto_debounce.setter
+    def auto_debounce(self, on):
+        """Use per key windows tuned from bounce statistics"""
+        self._auto_debounce = on
+        for key_index in range(self.keys):
+            self.tune(key_index)
+
+    @property
+    def idle_time(self):
+        return self._idle_time
+
+    @idle_time.setter
+    def idle_time(self, _t):
+        """Set quiet time before idle, None to keep scanning"""
+        self._idle_time = _t
 
     @property
     def hold_time(self):
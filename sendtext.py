@@ -0,0 +1,90 @@
+'''
+type text on the host with as few keyboard reports as it takes
+
+encode() turns text into report steps, 2 bytes each:
+    modifiers, key      key pressed on top of the keys held
+    modifiers, KEEP     modifiers change, keys stay down
+    modifiers, RELEASE  all keys up
+A step is one report. Keys stay down while the next characters are
+on other keys, so "abc" is [a] [a b] [a b c] [], a key is released only
+before it repeats or when the rollover is full. Shift and AltGr change
+only where the next character needs other modifiers, together with a
+release when there is one. Dead keys are followed by space.
+
+The characters a host types depend on its layout, see layouts.py.
+macros.py plays the steps.
+'''
+from layouts import US
+
+SHIFT = 0x02  # left shift in the report modifiers
+ALTGR = 0x40  # right alt
+DEAD = 0x10000
+RELEASE = 0x00
+KEEP = 0x01
+SPACE = 0x2C
+MOD_KEYCODE = 0xE0  # left control, bit 0 of the modifiers
+
+
+def stroke(layout, char):
+    '''
+    Returns:
+        keycode | modifiers << 8 | DEAD of char on layout, 0 when the
+        layout cannot type it
+    '''
+    codes, extra, altgr, dead = layout
+    i = ord(char)
+    if i >= 0x80:
+        i = extra.find(char)
+        if i < 0:
+            return 0
+        i += 128
+    code = codes[i]
+    if code & 0x7F < 4:
+        return 0  # no key, or TRANSPARENT
+    keycode = code & 0x7F
+    if code & 0x80:
+        keycode |= SHIFT << 8
+    if (altgr[i >> 3] >> (i & 7)) & 1:
+        keycode |= ALTGR << 8
+    if (dead[i >> 3] >> (i & 7)) & 1:
+        keycode |= DEAD
+    return keycode
+
+
+def encode(text, layout=US, rollover=6):
+    '''
+    Returns:
+        bytearray of report steps typing text, the characters layout
+        cannot type are left out
+    '''
+    steps = bytearray()
+    keys = bytearray(rollover)
+    state = [0, 0]  # modifiers, keys held
+
+    def type_key(keycode, mods):
+        held = state[1]
+        if held == rollover or keycode in keys[:held]:
+            steps.append(mods)
+            steps.append(RELEASE)
+            state[0] = mods
+            held = 0
+        elif mods != state[0]:
+            steps.append(mods)
+            steps.append(KEEP)
+            state[0] = mods
+        steps.append(mods)
+        steps.append(keycode)
+        keys[held] = keycode
+        state[1] = held + 1
+
+    for char in text:
+        code = stroke(layout, char)
+        if code:
+            type_key(code & 0xFF, (code >> 8) & 0xFF)
+            if code & DEAD:
+                type_key(SPACE, 0)
+    if state[1] or state[0]:
+        steps.append(0)
+        steps.append(RELEASE)
+    return steps
+
@@ -0,0 +1,165 @@
+'''tap or hold of dual-role keys, decided without blocking the main loop'''
+from array import array
+from time import ticks_diff
+
+
+class TapHold:
+    '''
+    Resolve one pending dual-role key at a time
+
+    A dual-role key starts pending on press. Events that follow it are
+    buffered until the key resolves:
+        tap     the key is released within tap_delay, or a key pressed
+                before it is released (rolling over from the last key)
+        hold    tap_delay expires, or a key pressed after it stays down
+                for fast_type_thresh
+    with policy flags
+        PERMISSIVE_HOLD         hold when a key pressed after it is also
+                                released
+        HOLD_ON_OTHER_KEY_PRESS hold as soon as another key is pressed
+    On resolution resolve(key, hold) is called, then the buffered events
+    are passed to handle(event, t) in order. handle may start() the next
+    dual-role key, the rest of the buffer is then checked against it.
+
+    Nothing here waits: call poll() from the main loop and sleep at most
+    timeout() ms.
+    '''
+
+    PERMISSIVE_HOLD = 1
+    HOLD_ON_OTHER_KEY_PRESS = 2
+
+    def __init__(self, resolve, handle, size=16, tap_delay=500,
+                 fast_type_thresh=200, policy=PERMISSIVE_HOLD):
+        self.resolve = resolve
+        self.handle = handle
+        self.size = size
+        self.tap_delay = tap_delay
+        self.fast_type_thresh = fast_type_thresh
+        self.policy = policy
+        self.key = -1  # pending key, -1 when none
+        self.since = 0  # keydown time of the pending key
+        self.events = bytearray(size)
+        self.times = array('L', [0] * size)
+        self.length = 0
+        self.resolutions = 0
+
+    @property
+    def pending(self):
+        return self.key >= 0
+
+    def start(self, key, t):
+        '''
+        Make key, pressed at t, the pending dual-role key
+        '''
+        self.key = key
+        self.since = t
+
+    def add(self, event, t):
+        '''
+        Buffer event at t if a key is pending
+
+        Returns:
+            False when nothing is pending and the caller handles event
+        '''
+        if self.key < 0:
+            return False
+        if self.length == self.size:
+            # buffer full, stop waiting
+            self._resolve(True)
+            if self.key < 0:
+                return False
+        self.events[self.length] = event
+        self.times[self.length] = t
+        self.length += 1
+        self._check(self.length - 1)
+        return True
+
+    def poll(self, t):
+        '''
+        Resolve the pending key as hold when its time is up
+        '''
+        if self.key >= 0 and self.timeout(t) == 0:
+            self._resolve(True)
+
+    def timeout(self, t):
+        '''
+        Returns:
+            ms until the pending key resolves by time, -1 when none
+        '''
+        if self.key < 0:
+            return -1
+        left = self.tap_delay - ticks_diff(t, self.since)
+        if self.fast_type_thresh:
+            for i in range(self.length):
+                event = self.events[i]
+                if event < 0x80 and not self._released(event, i + 1):
+                    # first key still held after the pending one
+                    left = min(left, self.fast_type_thresh - ticks_diff(t, self.times[i]))
+                    break
+        return max(left, 0)
+
+    def flush(self):
+        '''
+        Resolve the pending key, and every one the buffer starts, as hold
+        and pass all buffered events on
+        '''
+        while self.key >= 0:
+            self._resolve(True)
+
+    def clear(self):
+        self.key = -1
+        self.length = 0
+
+    def _released(self, key, start):
+        for i in range(start, self.length):
+            if self.events[i] == key | 0x80:
+                return True
+        return False
+
+    def _pressed(self, key, end):
+        for i in range(end):
+            if self.events[i] == key:
+                return True
+        return False
+
+    def _check(self, i):
+        event = self.events[i]
+        if event == self.key | 0x80:
+            self._resolve(False)
+        elif event >= 0x80:
+            if not self._pressed(event & 0x7F, i):
+                # rolling over: A↓ B↓ A↑, B is a tap
+                self._resolve(False)
+            elif self.policy & self.PERMISSIVE_HOLD:
+                # nested: B↓ C↓ C↑, B is a hold
+                self._resolve(True)
+        elif self.policy & self.HOLD_ON_OTHER_KEY_PRESS:
+            self._resolve(True)
+
+    def _resolve(self, hold):
+        key = self.key
+        self.key = -1
+        self.resolutions += 1
+        self.resolve(key, hold)
+        # replay until a buffered event starts the next dual-role key
+        while self.length and self.key < 0:
+            event = self.events[0]
+            t = self.times[0]
+            self._shift()
+            self.handle(event, t)
+        # check what is left against the new pending key
+        resolutions = self.resolutions
+        i = 0
+        while self.key >= 0 and i < self.length:
+            self._check(i)
+            if self.resolutions != resolutions:
+                break
+            i += 1
+
+    def _shift(self):
+        events = self.events
+        times = self.times
+        for i in range(1, self.length):
+            events[i - 1] = events[i]
+            times[i - 1] = times[i]
+        self.length -= 1
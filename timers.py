@@ -0,0 +1,234 @@
+'''deferred work of the main loops on one hierarchical timer wheel'''
+from array import array
+from time import ticks_ms, ticks_diff
+
+LEVELS = 4
+BITS = 4  # slots per level = 16, masks stay small ints
+SLOTS = 1 << BITS
+FAR = LEVELS * SLOTS  # slot of the timers beyond the wheel, 65 s and more
+DEFER = FAR + 1  # slot of the timers started expired by a callback
+
+
+class Timers:
+    '''
+    A fixed pool of timers on a 4 level wheel of 16 slots each, 1 ms ticks
+
+    A timer due at deadline sits at the level of the highest 4 bit digit
+    where deadline and now differ, in the slot of that digit:
+        level 0     1 ms slots, up to 16 ms ahead
+        level 1     16 ms slots, up to 256 ms ahead
+        level 2     256 ms slots, up to 4 s ahead
+        level 3     4 s slots, up to 65 s ahead
+        far         one unordered list, moved down every 65 s
+    so every timer of a level is due before the timers of the levels
+    above it. A slot is cascaded to the levels below when time reaches
+    it and fired when it is a level 0 slot. start() and cancel() unlink
+    and link one list node, timeout() finds the first slot from the
+    occupied bitmask of each level.
+
+    Timers are numbers from add(). callback() runs from poll() when the
+    timer expires, a timer with a period starts again period ms after
+    its deadline. A timer a callback starts already expired waits for
+    the next poll(), so a callback restarting itself at 0 ms cannot
+    keep poll() from returning. Nothing allocates after add().
+    '''
+
+    def __init__(self, size=16):
+        self.size = size
+        self.count = 0
+        self.callbacks = [None] * size
+        self.periods = array('L', [0] * size)
+        self.deadlines = array('L', [0] * size)
+        self.next = array('b', [-1] * size)
+        self.prev = array('b', [-1] * size)
+        self.where = array('b', [-1] * size)  # slot of each timer, -1 idle
+        self.heads = array('b', [-1] * (DEFER + 1))
+        self.masks = [0] * LEVELS  # occupied slots of each level
+        self.now = 0  # wheel time [ms], all slots before it are done
+        self.clock = 0  # wheel time of ticks_ms() self.t
+        self.t = ticks_ms()
+        self.start_ms = 0  # wheel time of the slot from _first()
+        self.fired = 0
+        self.polling = False
+
+    def add(self, callback, period=0):
+        '''
+        Add a stopped timer
+
+        Returns:
+            timer number for start() and cancel()
+        '''
+        n = self.count
+        if n == self.size:
+            raise ValueError('no free timer')
+        self.callbacks[n] = callback
+        self.periods[n] = period
+        self.count += 1
+        return n
+
+    def start(self, n, ms, t=None):
+        '''
+        (Re)start timer n to expire ms after t, or after its deadline
+        from the callback of a timer
+        '''
+        if t is None:
+            base = self.now
+        else:
+            base = max(self.clock + ticks_diff(t, self.t), self.now)
+        if self.where[n] >= 0:
+            self._unlink(n)
+        deadline = base + max(ms, 0)
+        self.deadlines[n] = deadline
+        if self.polling and deadline <= self.clock:
+            self._push(n, DEFER)
+        else:
+            self._link(n)
+
+    def cancel(self, n):
+        if self.where[n] >= 0:
+            self._unlink(n)
+
+    def active(self, n):
+        return self.where[n] >= 0
+
+    def timeout(self, t):
+        '''
+        Returns:
+            ms until the next timer expires, -1 when none runs
+        '''
+        slot = self._first()
+        if slot < 0:
+            return -1
+        deadline = self.start_ms
+        if slot >= SLOTS:
+            # the slot starts before its first deadline, find it
+            deadlines = self.deadlines
+            deadline = deadlines[self.heads[slot]]
+            n = self.heads[slot]
+            while n >= 0:
+                deadline = min(deadline, deadlines[n])
+                n = self.next[n]
+        return max(deadline - self.clock - ticks_diff(t, self.t), 0)
+
+    def poll(self, t):
+        '''
+        Run the callbacks of the timers expired by t
+
+        Returns:
+            number of callbacks run
+        '''
+        self.clock = max(self.clock + ticks_diff(t, self.t), self.now)
+        self.t = t
+        fired = 0
+        heads = self.heads
+        self.polling = True
+        try:
+            while True:
+                slot = self._first()
+                if slot < 0 or self.start_ms > self.clock:
+                    break
+                self.now = self.start_ms
+                if slot >= SLOTS:
+                    self._cascade(slot)
+                    continue
+                while heads[slot] >= 0:
+                    n = heads[slot]
+                    self._unlink(n)
+                    period = self.periods[n]
+                    if period:
+                        deadline = self.deadlines[n] + period
+                        if deadline <= self.clock:
+                            # fell behind, skip the missed periods
+                            deadline = self.clock + period
+                        self.deadlines[n] = deadline
+                        self._link(n)
+                    fired += 1
+                    self.callbacks[n]()
+        finally:
+            self.polling = False
+            self.now = self.clock
+            while heads[DEFER] >= 0:
+                # expired, due at the next poll()
+                n = heads[DEFER]
+                self._unlink(n)
+                self.deadlines[n] = self.now
+                self._link(n)
+            self.fired += fired
+        return fired
+
+    def _first(self):
+        # first occupied slot, its start time goes to start_ms
+        now = self.now
+        masks = self.masks
+        for level in range(LEVELS):
+            shift = level * BITS
+            digit = (now >> shift) & (SLOTS - 1)
+            mask = masks[level] >> digit
+            if mask:
+                while not mask & 1:
+                    mask >>= 1
+                    digit += 1
+                span = shift + BITS
+                self.start_ms = ((now >> span) << span) | (digit << shift)
+                return level * SLOTS + digit
+        if self.heads[FAR] >= 0:
+            self.start_ms = ((now >> (LEVELS * BITS)) + 1) << (LEVELS * BITS)
+            return FAR
+        return -1
+
+    def _cascade(self, slot):
+        # move the timers of slot, now reached, to the levels below
+        n = self.heads[slot]
+        self.heads[slot] = -1
+        if slot < FAR:
+            self.masks[slot >> BITS] &= ~(1 << (slot & (SLOTS - 1)))
+        else:
+            # wheel time restarts at 0 every 65 s so it stays a small
+            # int, the levels are empty when time reaches the far slot
+            base = self.now
+            self.now = 0
+            self.clock -= base
+        while n >= 0:
+            after = self.next[n]
+            if slot == FAR:
+                self.deadlines[n] -= base
+            self._link(n)
+            n = after
+
+    def _link(self, n):
+        deadline = self.deadlines[n]
+        now = self.now
+        if deadline < now:
+            deadline = self.deadlines[n] = now
+        diff = deadline ^ now
+        slot = FAR
+        for level in range(LEVELS):
+            if diff >> ((level + 1) * BITS) == 0:
+                digit = (deadline >> (level * BITS)) & (SLOTS - 1)
+                self.masks[level] |= 1 << digit
+                slot = level * SLOTS + digit
+                break
+        self._push(n, slot)
+
+    def _push(self, n, slot):
+        head = self.heads[slot]
+        self.next[n] = head
+        self.prev[n] = -1
+        if head >= 0:
+            self.prev[head] = n
+        self.heads[slot] = n
+        self.where[n] = slot
+
+    def _unlink(self, n):
+        slot = self.where[n]
+        prev = self.prev[n]
+        after = self.next[n]
+        if prev >= 0:
+            self.next[prev] = after
+        else:
+            self.heads[slot] = after
+        if after >= 0:
+            self.prev[after] = prev
+        if slot < FAR and self.heads[slot] < 0:
+            self.masks[slot >> BITS] &= ~(1 << (slot & (SLOTS - 1)))
+        self.where[n] = -1